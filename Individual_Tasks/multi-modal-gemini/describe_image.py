@@ -30,6 +30,42 @@ client = genai.Client(
     location=location
 )
 
+# Images above this size are referenced from Cloud Storage instead of sent inline
+INLINE_IMAGE_LIMIT = 4_000_000
+# Optional bucket for large images (set GCS_BUCKET in .env to enable;
+# needs google-cloud-storage)
+gcs_bucket = os.getenv("GCS_BUCKET")
+
+def image_part(image_path):
+    """
+    Build the image Part for a request. Small images are sent inline; large ones
+    are uploaded to GCS once and passed by gs:// URI so the request stays small.
+    The object name includes the file's size and mtime, so a re-captured image
+    under the same file name is uploaded again rather than reusing the old one.
+    """
+    if gcs_bucket and os.path.getsize(image_path) > INLINE_IMAGE_LIMIT:
+        # Only needed for the large-image path
+        from google.cloud import storage
+
+        stat = os.stat(image_path)
+        stem, ext = os.path.splitext(os.path.basename(image_path))
+        blob_name = f"{stem}-{stat.st_size}-{stat.st_mtime_ns}{ext}"
+        blob = storage.Client(project=project_id).bucket(gcs_bucket).blob(blob_name)
+        if not blob.exists():
+            blob.upload_from_filename(image_path, content_type="image/jpeg")
+        return types.Part.from_uri(
+            file_uri=f"gs://{gcs_bucket}/{blob_name}",
+            mime_type="image/jpeg",
+        )
+
+    # Read the image file as bytes
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    return types.Part.from_bytes(
+        data=image_bytes,
+        mime_type="image/jpeg",
+    )
+
 def analyze_image(image_path, prompt):
     # Check if the image path is absolute, if not make it relative to the script's directory
     if not os.path.isabs(image_path):
@@ -40,19 +76,12 @@ def analyze_image(image_path, prompt):
         print(f"Error: Image file not found at {image_path}")
         return
 
-    # Read the image file as bytes
-    with open(image_path, "rb") as f:
-        image_bytes = f.read()
-
     # Create the multimodal request
     try:
         response = client.models.generate_content(
             model="gemini-3-flash-preview",
             contents=[
-                types.Part.from_bytes(
-                    data=image_bytes,
-                    mime_type="image/jpeg",
-                ),
+                image_part(image_path),
                 prompt
             ]
         )
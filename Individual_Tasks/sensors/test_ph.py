@@ -1,37 +1,72 @@
+import random
 import time
 import board
 import busio
-from adafruit_ads1x15.ads1115 import ADS1115
-from adafruit_ads1x15.analog_in import AnalogIn
+from adafruit_bus_device.i2c_device import I2CDevice
+
+# Poll every BASE_INTERVAL seconds, backing off up to MAX_INTERVAL on errors
+BASE_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+
+# --- ADS1115 REGISTERS ---
+ADS1115_ADDRESS = 0x48
+CONVERSION_REG = 0x00
+CONFIG_REG = 0x01
+
+# Config word: PGA +/-4.096V (GAIN=1) | continuous mode | 860 SPS | comparator off.
+# The two channels differ only in the MUX bits (AINx vs GND), so both words are
+# built once here and the loop just writes whichever one it needs.
+BASE_CONFIG = 0x0200 | 0x00E0 | 0x0003
+TDS_CONFIG = bytes([CONFIG_REG, *(BASE_CONFIG | (0b100 << 12)).to_bytes(2, "big")])  # Channel 0 = TDS Sensor
+PH_CONFIG = bytes([CONFIG_REG, *(BASE_CONFIG | (0b101 << 12)).to_bytes(2, "big")])   # Channel 1 = pH Sensor
+READ_CONVERSION = bytes([CONVERSION_REG])
+
+# Wait two conversion periods after a MUX change before reading
+SETTLE_TIME = 2 / 860
+
+# GAIN=1 is +/-4.096 V full scale; convert raw counts with one multiply
+volts_per_count = 4.096 / 32767
 
 # --- SETUP ---
 try:
-    i2c = busio.I2C(board.SCL, board.SDA)
-    ads = ADS1115(i2c)
-    
-    # Channel 0 = TDS Sensor
-    tds_channel = AnalogIn(ads, 0)
-    
-    # Channel 1 = pH Sensor
-    ph_channel = AnalogIn(ads, 1)
+    # 400 kHz fast mode; the ADS1115 supports it and it shortens every transfer
+    i2c = busio.I2C(board.SCL, board.SDA, frequency=400000)
+    adc = I2CDevice(i2c, ADS1115_ADDRESS)
+    raw_buf = bytearray(2)
+    last_config = None
     
     print("✅ Sensors Initialized")
 except Exception as e:
     print(f"❌ Initialization Error: {e}")
 
+
+def read_channel(config_word):
+    """Read one channel in volts, writing the config register only when the channel changes."""
+    global last_config
+    with adc:
+        if config_word != last_config:
+            adc.write(config_word)
+            last_config = config_word
+            time.sleep(SETTLE_TIME)
+        adc.write_then_readinto(READ_CONVERSION, raw_buf)
+    return int.from_bytes(raw_buf, "big", signed=True) * volts_per_count
+
+
 print("\nStarting Water Monitor... (Press CTRL+C to stop)")
 print(f"{'VOLTS (pH)':<12} | {'Est. pH':<10} | {'VOLTS (TDS)':<12} | {'Est. TDS'}")
 print("-" * 60)
 
+interval = BASE_INTERVAL
+
 while True:
     try:
         # --- READ TDS ---
-        tds_volt = tds_channel.voltage
-        # Generic TDS Formula
-        tds_val = (133.42 * tds_volt**3 - 255.86 * tds_volt**2 + 857.39 * tds_volt) * 0.5
+        tds_volt = read_channel(TDS_CONFIG)
+        # Generic TDS Formula: (133.42*v^3 - 255.86*v^2 + 857.39*v) * 0.5, in Horner form
+        tds_val = ((133.42 * tds_volt - 255.86) * tds_volt + 857.39) * tds_volt * 0.5
 
         # --- READ pH ---
-        ph_volt = ph_channel.voltage
+        ph_volt = read_channel(PH_CONFIG)
         
         # pH CALIBRATION NOTE:
         # This formula assumes the sensor is perfectly centered (2.5V = pH 7).
@@ -46,8 +81,11 @@ while True:
         ph_val = 7 + ((2.5 - ph_volt) * 3.5) 
 
         print(f"{ph_volt:.4f} V   | {ph_val:.2f} pH     | {tds_volt:.4f} V   | {tds_val:.0f} ppm")
-        
+        interval = BASE_INTERVAL
+
     except Exception as e:
         print(f"Error: {e}")
-        
-    time.sleep(5)
\ No newline at end of file
+        interval = min(MAX_INTERVAL, interval * 2)
+
+    # Jitter keeps several monitors sharing the I2C bus from polling in lockstep
+    time.sleep(interval * random.uniform(0.9, 1.1))
\ No newline at end of file
@@ -3,6 +3,8 @@ import board
 import adafruit_dht
 import glob
 import os
+import queue
+import threading
 
 # ==========================================
 # CONFIGURATION
@@ -14,6 +16,9 @@ AIR_PIN = board.D17
 # No pin setup needed here, the system handles it via the file system.
 BASE_DIR = '/sys/bus/w1/devices/'
 
+# Seconds between readings (DHT22 requires at least 2 seconds)
+READ_INTERVAL = 5.0
+
 # ==========================================
 # SETUP
 # ==========================================
@@ -21,7 +26,8 @@ print("Initializing sensors...")
 
 # Setup Air Sensor
 try:
-    dht_device = adafruit_dht.DHT22(AIR_PIN)
+    # PulseIn captures the DHT22 bit timings in C instead of bit-banging in Python
+    dht_device = adafruit_dht.DHT22(AIR_PIN, use_pulseio=True)
     print("✅ Air Sensor (DHT22) initialized.")
 except Exception as e:
     print(f"❌ Error initializing Air Sensor: {e}")
@@ -38,6 +44,52 @@ else:
     print("   -> Check if the Red/Black/Yellow wires are tight in the adapter.")
     print("   -> Check if 'dtoverlay=w1-gpio' is in /boot/firmware/config.txt")
 
+# ==========================================
+# BACKGROUND WATER SENSOR READER
+# ==========================================
+def water_sensor_worker(path, out):
+    """
+    Poll the DS18B20 in the background so its ~750ms conversion never
+    stalls the DHT22 read. Only the freshest reading is kept in `out`.
+    """
+    # w1_slave is ~75 bytes; re-reading offset 0 of the open fd triggers a new read
+    buf = bytearray(128)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        while True:
+            value = "Error"
+            try:
+                n = os.preadv(fd, [buf], 0)
+                # Only buf[:n] is from this read; the rest is left over from the last one
+                line_end = buf.find(b'\n', 0, n)
+                # The sensor returns "YES" at the end of line 1 if the read was good
+                if line_end != -1 and buf.find(b'YES', 0, line_end) != -1:
+                    equals_pos = buf.find(b't=', line_end, n)
+                    if equals_pos != -1:
+                        temp_end = buf.find(b'\n', equals_pos, n)
+                        milli_c = int(buf[equals_pos+2:temp_end if temp_end != -1 else n])
+                        value = f"{milli_c / 1000.0:.1f}°C"
+            except Exception:
+                pass
+
+            try:
+                out.get_nowait()
+            except queue.Empty:
+                pass
+            out.put_nowait(value)
+            time.sleep(READ_INTERVAL)
+    finally:
+        os.close(fd)
+
+
+water_queue = queue.Queue(maxsize=1)
+water_str = "No Sensor"
+if water_sensor_path:
+    water_str = "..."
+    threading.Thread(
+        target=water_sensor_worker, args=(water_sensor_path, water_queue), daemon=True
+    ).start()
+
 print("\nStarting readings (Press CTRL+C to stop)...\n")
 print(f"{'TIMESTAMP':<10} | {'AIR TEMP':<12} | {'HUMIDITY':<10} | {'WATER TEMP':<12}")
 print("-" * 55)
@@ -64,21 +116,11 @@ while True:
             air_str = "Retrying..."
             hum_str = "..."
 
-        # --- READ WATER SENSOR ---
-        water_str = "No Sensor"
-        if water_sensor_path:
-            try:
-                with open(water_sensor_path, 'r') as f:
-                    lines = f.readlines()
-                # The sensor returns "YES" if the read was good
-                if lines[0].strip()[-3:] == 'YES':
-                    equals_pos = lines[1].find('t=')
-                    if equals_pos != -1:
-                        temp_string = lines[1][equals_pos+2:]
-                        water_temp_c = float(temp_string) / 1000.0
-                        water_str = f"{water_temp_c:.1f}°C"
-            except Exception:
-                water_str = "Error"
+        # --- READ WATER SENSOR (latest value from the background thread) ---
+        try:
+            water_str = water_queue.get_nowait()
+        except queue.Empty:
+            pass
 
         # --- PRINT RESULT ---
         curr_time = time.strftime("%H:%M:%S")
@@ -92,4 +134,4 @@ while True:
         print(f"Unexpected error: {e}")
 
     # DHT22 requires at least 2 seconds between reads
-    time.sleep(5.0)
\ No newline at end of file
+    time.sleep(READ_INTERVAL)
\ No newline at end of file
@@ -1,12 +1,19 @@
+import random
 import time
 import board
 import busio
 from adafruit_ads1x15.ads1115 import ADS1115
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 
+# Poll every BASE_INTERVAL seconds, backing off up to MAX_INTERVAL on errors
+BASE_INTERVAL = 1.0
+MAX_INTERVAL = 30.0
+
 # Initialize I2C bus
 try:
-    i2c = busio.I2C(board.SCL, board.SDA)
+    # 400 kHz fast mode; the ADS1115 supports it and it shortens every transfer
+    i2c = busio.I2C(board.SCL, board.SDA, frequency=400000)
     print("✅ I2C Bus initialized")
 except Exception as e:
     print(f"❌ I2C Error: {e}")
@@ -15,6 +22,15 @@ except Exception as e:
 try:
     ads = ADS1115(i2c)
     print("✅ ADS1115 Board Object Created")
+
+    # Continuous conversions at max rate: a read just fetches the last result
+    # instead of triggering a single-shot conversion and waiting for it
+    ads.mode = Mode.CONTINUOUS
+    ads.data_rate = 860
+
+    # GAIN=1 is +/-4.096 V full scale; convert raw counts with one multiply
+    ads.gain = 1
+    volts_per_count = 4.096 / 32767
     
     # We use channel 0 (P0) for the TDS sensor
     # We use the number 0 directly to avoid library version errors
@@ -28,18 +44,24 @@ except Exception as e:
 print("\nReading TDS Sensor... (Press CTRL+C to stop)")
 print("-" * 30)
 
+interval = BASE_INTERVAL
+
 while True:
     try:
         # Read voltage
-        voltage = tds_channel.voltage
+        voltage = tds_channel.value * volts_per_count
         
-        # Calculate TDS (Generic estimation)
-        tds_value = (133.42 * voltage**3 - 255.86 * voltage**2 + 857.39 * voltage) * 0.5
+        # Calculate TDS (Generic estimation): (133.42*v^3 - 255.86*v^2 + 857.39*v) * 0.5
+        tds_value = ((133.42 * voltage - 255.86) * voltage + 857.39) * voltage * 0.5
         
         print(f"Voltage: {voltage:.4f} V  |  Est. TDS: {tds_value:.0f} ppm")
+        interval = BASE_INTERVAL
     except OSError:
         print("❌ Read Error: Check Soldering!")
+        interval = min(MAX_INTERVAL, interval * 2)
     except Exception as e:
         print(f"Error: {e}")
-        
-    time.sleep(1)
\ No newline at end of file
+        interval = min(MAX_INTERVAL, interval * 2)
+
+    # Jitter keeps several monitors sharing the I2C bus from polling in lockstep
+    time.sleep(interval * random.uniform(0.9, 1.1))
\ No newline at end of file
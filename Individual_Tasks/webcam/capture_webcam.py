@@ -37,11 +37,11 @@ def capture_photo(filename=None):
 
     try:
         # USB Webcams often need a "warm up" period for auto-exposure to adjust.
-        # We capture a few frames and discard them.
+        # We grab a few frames and discard them; grab() skips the decode that read() does.
         log("Warming up sensor...")
         for i in range(10):
-            cap.read()
-            time.sleep(0.1)
+            cap.grab()
+            time.sleep(0.03)
 
         # Capture the actual frame
         ret, frame = cap.read()
@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 import socket
 import struct
 import os
@@ -6,71 +7,159 @@ import datetime
 import argparse
 import sys
 import gc
+from fractions import Fraction
+
+# Optional: PyAV (pip install av) lets us remux the received JPEGs straight
+# into the recording instead of decoding and re-encoding every frame
+try:
+    import av
+except ImportError:
+    av = None
 
 # Global debug flag
 DEBUG = False
 
+# Initial receive buffer size; grown if a single frame ever exceeds it
+RECV_BUFFER_SIZE = 2 * 1024 * 1024
+
+# Kernel socket buffer size; room for several full 1080p JPEG frames
+SOCKET_BUFFER_SIZE = 4 << 20
+
+# Precompiled 4-byte big-endian length prefix sent before every frame
+_HDR = struct.Struct(">L")
+
+# Recording frame rate
+RECORDING_FPS = 20
+
 def log(message):
     if DEBUG:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{timestamp}] {message}")
 
+class JpegRemuxWriter:
+    """Writes already-encoded JPEG frames into an MJPEG .mkv without decoding them."""
+
+    def __init__(self, filename, width, height, fps):
+        self.container = av.open(filename, 'w')
+        self.stream = self.container.add_stream('mjpeg', rate=fps)
+        self.stream.width = width
+        self.stream.height = height
+        self.stream.pix_fmt = 'yuvj420p'
+        self.time_base = Fraction(1, fps)
+        self.pts = 0
+
+    def write(self, jpeg_bytes):
+        packet = av.Packet(jpeg_bytes)
+        packet.stream = self.stream
+        packet.time_base = self.time_base
+        packet.pts = packet.dts = self.pts
+        self.pts += 1
+        self.container.mux(packet)
+
+    def release(self):
+        self.container.close()
+
+def open_writer(output_dir, width, height):
+    """Start a recording: remuxed .mkv when PyAV is available, else OpenCV .avi."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if av is not None:
+        filename = os.path.join(output_dir, f"remote_recording_{timestamp}.mkv")
+        out = JpegRemuxWriter(filename, width, height, RECORDING_FPS)
+    else:
+        filename = os.path.join(output_dir, f"remote_recording_{timestamp}.avi")
+        # MJPG is usually safe for Windows/Linux interoperability in OpenCV
+        fourcc = cv2.VideoWriter_fourcc(*'MJPG') 
+        out = cv2.VideoWriter(filename, fourcc, float(RECORDING_FPS), (width, height))
+    log(f"Recording started: {filename}")
+    if not DEBUG:
+        print(f"Recording to: {filename}")
+    return out
+
 def handle_client(conn, addr, output_dir):
     log(f"Connection from: {addr}")
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     out = None
     display_enabled = True
     
     try:
-        data = b""
-        payload_size = struct.calcsize(">L")
+        payload_size = _HDR.size
+        # Received bytes land directly in one reusable buffer; buf[:filled] is unread data
+        buf = bytearray(RECV_BUFFER_SIZE)
+        view = memoryview(buf)
+        filled = 0
+        frame_end = 0
+        jpeg = None
+        # Last recorded frame (JPEG bytes or decoded image), re-written on repeat markers
+        last_frame = None
+        # Local aliases for the per-frame calls
+        imdecode = cv2.imdecode
+        frombuffer = np.frombuffer
+        unpack_from = _HDR.unpack_from
         
         while True:
+            # Drop the previous message; bytes already received for the next one move to the front
+            jpeg = None
+            leftover = filled - frame_end
+            view[:leftover] = view[frame_end:filled]
+            filled = leftover
+            
             # Retrieve message size
-            while len(data) < payload_size:
-                packet = conn.recv(4096)
-                if not packet: 
+            while filled < payload_size:
+                n = conn.recv_into(view[filled:])
+                if not n: 
                     return # Connection closed
-                data += packet
+                filled += n
             
-            packed_msg_size = data[:payload_size]
-            data = data[payload_size:]
-            msg_size = struct.unpack(">L", packed_msg_size)[0]
+            msg_size = unpack_from(buf, 0)[0]
+            frame_end = payload_size + msg_size
+            if frame_end > len(buf):
+                # The view must be released before the bytearray can be resized
+                view.release()
+                buf.extend(bytearray(frame_end - len(buf)))
+                view = memoryview(buf)
             
             # Retrieve frame data
-            while len(data) < msg_size:
-                packet = conn.recv(4096)
-                if not packet:
+            while filled < frame_end:
+                n = conn.recv_into(view[filled:])
+                if not n:
                     return # Connection closed mid-frame
-                data += packet
-                
-            frame_data = data[:msg_size]
-            data = data[msg_size:]
+                filled += n
             
-            # Decode frame
-            import numpy as np
-            frame = cv2.imdecode(np.frombuffer(frame_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-            
-            if frame is None:
+            if not msg_size:
+                # Repeat marker: the sender saw no change, so record the previous frame again
+                if last_frame is not None:
+                    out.write(last_frame)
                 continue
+            jpeg = frombuffer(view[payload_size:frame_end], dtype=np.uint8)
+
+            # Full decode only when we need pixels: the first frame (for the
+            # recording size) or every frame when falling back to OpenCV's writer
+            frame = None
+            if out is None or av is None:
+                frame = imdecode(jpeg, cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
 
             # Initialize video writer once we have the frame dimensions
             if out is None:
                 height, width, _ = frame.shape
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(output_dir, f"remote_recording_{timestamp}.avi")
-                # MJPG is usually safe for Windows/Linux interoperability in OpenCV
-                fourcc = cv2.VideoWriter_fourcc(*'MJPG') 
-                out = cv2.VideoWriter(filename, fourcc, 20.0, (width, height))
-                log(f"Recording started: {filename}")
-                if not DEBUG:
-                    print(f"Recording to: {filename}")
-
-            out.write(frame)
+                out = open_writer(output_dir, width, height)
+
+            if av is not None:
+                # Copy out of the receive buffer, which is reused for the next frame
+                last_frame = jpeg.tobytes()
+            else:
+                last_frame = frame
+            out.write(last_frame)
             
             # Optional: Display the stream
             if display_enabled:
                 try:
-                    cv2.imshow('Remote Camera', frame)
+                    # Reuse a full decode if we already have one; otherwise the preview
+                    # doesn't need full resolution and libjpeg decodes at 1/2 scale directly
+                    preview = frame if frame is not None else imdecode(jpeg, cv2.IMREAD_REDUCED_COLOR_2)
+                    if preview is not None:
+                        cv2.imshow('Remote Camera', preview)
                     if cv2.waitKey(1) == ord('q'):
                         log("Stop signal received from GUI.")
                         break
@@ -106,6 +195,8 @@ def start_server(host, port, output_dir):
 
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Set before listen() so accepted connections inherit it and get a large TCP window
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
     
     try:
         server_socket.bind((host, port))
@@ -1,12 +1,112 @@
 import cv2
+import queue
 import socket
 import struct
+import threading
 import time
 import argparse
 
+# Optional: libjpeg-turbo bindings (pip install PyTurboJPEG) encode ~2-3x faster
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
+# Frames buffered between pipeline stages (capture -> encode -> send)
+PIPELINE_DEPTH = 2
+
+# Kernel socket buffer size; room for several full 1080p JPEG frames
+SOCKET_BUFFER_SIZE = 4 << 20
+
+
+def _put(q, item, stop):
+    """Put item on q, giving up if the pipeline is stopping. Returns True if queued."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def capture_worker(cap, frames, stop):
+    """Stage 1: read frames from the camera. Puts None when capture ends."""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            print("Error: Failed to capture frame.")
+            break
+        if not _put(frames, frame, stop):
+            return
+    _put(frames, None, stop)
+
+
+def make_encoder(jpeg_quality):
+    """Return a frame -> JPEG bytes function (None on failure), preferring TurboJPEG."""
+    if TurboJPEG is not None:
+        try:
+            tj = TurboJPEG()
+            print("Using TurboJPEG encoder")
+            return lambda frame: tj.encode(frame, quality=jpeg_quality, pixel_format=TJPF_BGR)
+        except OSError as e:
+            # Python bindings present but libturbojpeg itself is missing
+            print(f"TurboJPEG unavailable ({e}), using OpenCV encoder")
+
+    params = [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality]
+
+    def encode(frame):
+        result, frame_encoded = cv2.imencode('.jpg', frame, params)
+        # Hand the encoded array straight to the socket; no .tobytes() copy
+        return frame_encoded if result else None
+    return encode
+
+
+# Precompiled 4-byte big-endian length prefix, reused in place for every frame
+_HDR = struct.Struct(">L")
+_header = bytearray(_HDR.size)
+
+
+def send_frame(sock, data):
+    """
+    Send one length-prefixed frame. Header and payload go to the kernel as a
+    scatter-gather list, so they are never concatenated into a new bytes object.
+    """
+    payload = memoryview(data).cast('B')
+    _HDR.pack_into(_header, 0, len(payload))
+    buffers = [memoryview(_header), payload]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Drop whatever the kernel accepted; resend the remainder
+        while sent:
+            if sent >= len(buffers[0]):
+                sent -= len(buffers.pop(0))
+            else:
+                buffers[0] = buffers[0][sent:]
+                sent = 0
+
+
+def encode_worker(frames, encoded, jpeg_quality, stop):
+    """Stage 2: JPEG-encode captured frames. Forwards the None end marker."""
+    encode = make_encoder(jpeg_quality)
+    while not stop.is_set():
+        try:
+            frame = frames.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if frame is None:
+            break
+        data = encode(frame)
+        if data is not None and not _put(encoded, data, stop):
+            return
+    _put(encoded, None, stop)
+
 
 def stream_video(server_ip, server_port, duration_minutes, width, height, fps, jpeg_quality, hw_fps):
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Send each frame immediately instead of letting Nagle hold back the tail
+    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
     
     try:
         print(f"Connecting to {server_ip}:{server_port}...")
@@ -41,25 +141,37 @@ def stream_video(server_ip, server_port, duration_minutes, width, height, fps, j
         client_socket.close()
         return
 
+    # Each stage runs on its own thread; keep OpenCV from spawning more on top
+    cv2.setNumThreads(1)
+
+    frames = queue.Queue(maxsize=PIPELINE_DEPTH)
+    encoded = queue.Queue(maxsize=PIPELINE_DEPTH)
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=capture_worker, args=(cap, frames, stop), daemon=True),
+        threading.Thread(target=encode_worker, args=(frames, encoded, jpeg_quality, stop), daemon=True),
+    ]
+
     start_time = time.time()
     duration_seconds = duration_minutes * 60
     
     print(f"Streaming for {duration_minutes} minutes...")
 
     try:
+        for worker in workers:
+            worker.start()
+
         while (time.time() - start_time) < duration_seconds:
-            # Capture frame (blocking wait for next frame from camera)
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Failed to capture frame.")
+            # Capture and encode of the next frames overlap with this send
+            try:
+                data = encoded.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if data is None:
                 break
             
-            # Encode frame as JPEG
-            result, frame_encoded = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality])
-            data = frame_encoded.tobytes()
-            
             # Send message
-            client_socket.sendall(struct.pack(">L", len(data)) + data)
+            send_frame(client_socket, data)
             
             # No manual sleep needed if HW FPS matches target FPS.
             # cap.read() will effectively sleep for 1/FPS seconds.
@@ -69,6 +181,10 @@ def stream_video(server_ip, server_port, duration_minutes, width, height, fps, j
     except Exception as e:
         print(f"Error during streaming: {e}")
     finally:
+        stop.set()
+        for worker in workers:
+            if worker.is_alive():
+                worker.join(timeout=2.0)
         cap.release()
         client_socket.close()
         print("Stream finished.")
@@ -8,6 +8,7 @@ Dosing pumps via Adafruit MotorKit (I2C, lazy-loaded).
 import json
 import logging
 import os
+import threading
 import time
 
 import tinytuya
@@ -17,20 +18,135 @@ import config
 logger = logging.getLogger(__name__)
 
 
+# Parsed devices.json (name -> (id, key)), refreshed when the file's mtime changes
+_DEVICE_CACHE = {}
+_DEVICE_MTIME = None
+
+
 def _load_device_info():
-    """Load Tuya device ID and local key from devices.json."""
-    if not os.path.exists(config.DEVICES_JSON):
+    """Load Tuya device ID and local key from devices.json (cached by mtime)."""
+    global _DEVICE_MTIME
+
+    try:
+        mtime = os.stat(config.DEVICES_JSON).st_mtime
+    except FileNotFoundError:
         raise FileNotFoundError(f"devices.json not found at {config.DEVICES_JSON}")
 
-    with open(config.DEVICES_JSON, "r") as f:
-        devices = json.load(f)
+    if mtime != _DEVICE_MTIME:
+        with open(config.DEVICES_JSON, "r") as f:
+            devices = json.load(f)
+
+        _DEVICE_CACHE.clear()
+        for dev in devices:
+            creds = (dev.get("id"), dev.get("key"))
+            # First matching device wins, same as the original linear scan
+            for name in (dev.get("name"), dev.get("product_name", "").strip()):
+                if name:
+                    _DEVICE_CACHE.setdefault(name, creds)
+        _DEVICE_MTIME = mtime
+
+    try:
+        return _DEVICE_CACHE[config.TUYA_DEVICE_NAME]
+    except KeyError:
+        raise ValueError(f"Device '{config.TUYA_DEVICE_NAME}' not found in devices.json")
+
+
+# Shared Tuya device, built on first use and kept on a persistent socket.
+# _TUYA_LOCK serializes commands and heartbeats on that socket.
+_TUYA_DEV = None
+_TUYA_LOCK = threading.RLock()
+_HEARTBEAT = None
+
+
+def _get_device():
+    """Return the shared Tuya device, creating it on first use."""
+    global _TUYA_DEV
+    with _TUYA_LOCK:
+        if _TUYA_DEV is None:
+            device_id, local_key = _load_device_info()
+
+            d = tinytuya.OutletDevice(device_id, config.TUYA_IP, local_key)
+            d.set_version(config.TUYA_VERSION)
+            d.set_socketPersistent(True)
+            # Fail fast and let _send_command's retry loop reconnect
+            d.set_socketRetryLimit(1)
+            d.set_socketTimeout(config.TUYA_SOCKET_TIMEOUT)
+            _TUYA_DEV = d
+            _schedule_heartbeat()
+        return _TUYA_DEV
+
+
+def _reset_device():
+    """Drop the shared device so the next command reconnects."""
+    global _TUYA_DEV, _HEARTBEAT
+    with _TUYA_LOCK:
+        if _HEARTBEAT is not None:
+            _HEARTBEAT.cancel()
+            _HEARTBEAT = None
+        if _TUYA_DEV is not None:
+            try:
+                _TUYA_DEV.close()
+            except Exception:
+                pass
+            _TUYA_DEV = None
+
+
+def _schedule_heartbeat():
+    """Arm the next keep-alive for the persistent socket."""
+    global _HEARTBEAT
+    _HEARTBEAT = threading.Timer(config.TUYA_HEARTBEAT_INTERVAL, _heartbeat)
+    _HEARTBEAT.daemon = True
+    _HEARTBEAT.start()
+
 
-    for dev in devices:
-        if dev.get("name") == config.TUYA_DEVICE_NAME or \
-           dev.get("product_name", "").strip() == config.TUYA_DEVICE_NAME:
-            return dev.get("id"), dev.get("key")
+def _heartbeat():
+    """Keep the Tuya session alive between commands; drop it if the device stops answering."""
+    with _TUYA_LOCK:
+        # A timer that fired while a reset was in progress may find a newer
+        # device and timer in place; only the current timer keeps the chain
+        if _HEARTBEAT is not threading.current_thread() or _TUYA_DEV is None:
+            return
+        try:
+            result = _TUYA_DEV.heartbeat(nowait=False)
+        except Exception as e:
+            result = {"Error": str(e)}
+
+        if isinstance(result, dict) and "Error" in result:
+            logger.debug("Tuya heartbeat failed: %s", result["Error"])
+            _reset_device()
+        else:
+            _schedule_heartbeat()
 
-    raise ValueError(f"Device '{config.TUYA_DEVICE_NAME}' not found in devices.json")
+
+def _send_command(command):
+    """
+    Run command(device) against the shared Tuya device, retrying on failure.
+
+    tinytuya reports most failures as an {"Error": ...} dict rather than raising,
+    so both cases are treated as a failed attempt.
+
+    Raises:
+        RuntimeError if every attempt fails.
+    """
+    error = None
+    with _TUYA_LOCK:
+        for attempt in range(config.TUYA_COMMAND_RETRIES + 1):
+            if attempt:
+                time.sleep(config.TUYA_COMMAND_DELAY)
+            d = _get_device()
+            try:
+                result = command(d)
+            except Exception as e:
+                result = {"Error": str(e)}
+
+            if not (isinstance(result, dict) and "Error" in result):
+                return result
+
+            error = result["Error"]
+            logger.debug("Tuya command attempt %d failed: %s", attempt + 1, error)
+            _reset_device()
+
+    raise RuntimeError(error)
 
 
 def set_light(state):
@@ -44,12 +160,7 @@ def set_light(state):
         True on success, False on failure.
     """
     try:
-        device_id, local_key = _load_device_info()
-
-        d = tinytuya.OutletDevice(device_id, config.TUYA_IP, local_key)
-        d.set_version(config.TUYA_VERSION)
-
-        d.set_status(state == "on", switch=int(config.DPS_LIGHT))
+        _send_command(lambda d: d.set_status(state == "on", switch=int(config.DPS_LIGHT)))
         logger.info("Set Light (DPS %s) to %s", config.DPS_LIGHT, "ON" if state == "on" else "OFF")
         return True
 
@@ -58,9 +169,30 @@ def set_light(state):
         return False
 
 
+def set_humidifier(state):
+    """
+    Set only the humidifier plug state, leaving light and air pump untouched.
+
+    Args:
+        state: "on" or "off"
+
+    Returns:
+        True on success, False on failure.
+    """
+    try:
+        _send_command(lambda d: d.set_status(state == "on", switch=int(config.DPS_HUMIDIFIER)))
+        logger.info("Set Humidifier (DPS %s) to %s", config.DPS_HUMIDIFIER, "ON" if state == "on" else "OFF")
+        return True
+
+    except Exception as e:
+        logger.error("Failed to set humidifier: %s", e)
+        return False
+
+
 def set_smart_plugs(light, air_pump, humidifier):
     """
     Set smart plug states via tinytuya.
+    All three switches are written in a single multi-DPS payload.
 
     Args:
         light: "on" or "off"
@@ -68,30 +200,40 @@ def set_smart_plugs(light, air_pump, humidifier):
         humidifier: "on" or "off"
     """
     try:
-        device_id, local_key = _load_device_info()
-
-        d = tinytuya.OutletDevice(device_id, config.TUYA_IP, local_key)
-        d.set_version(config.TUYA_VERSION)
-
         commands = [
             (config.DPS_LIGHT, light == "on", "Light"),
             (config.DPS_AIR_PUMP, air_pump == "on", "Air Pump"),
             (config.DPS_HUMIDIFIER, humidifier == "on", "Humidifier"),
         ]
+        values = {str(dps): state for dps, state, _ in commands}
 
+        _send_command(lambda d: d.set_multiple_values(values))
         for dps, state, name in commands:
-            try:
-                d.set_status(state, switch=int(dps))
-                logger.info("Set %s (DPS %s) to %s", name, dps, "ON" if state else "OFF")
-            except Exception as e:
-                logger.error("Failed to set %s: %s", name, e)
-            time.sleep(config.TUYA_COMMAND_DELAY)
+            logger.info("Set %s (DPS %s) to %s", name, dps, "ON" if state else "OFF")
 
     except Exception as e:
         logger.error("Smart plug control failed: %s", e)
         logger.warning("Plugs retain their last state")
 
 
+# Shared MotorKit, created on the first dose so importing this module never touches I2C
+_KIT = None
+_KIT_LOCK = threading.Lock()
+
+
+def _get_motor_kit():
+    """Return the shared MotorKit, initializing the PCA9685 on first use."""
+    global _KIT
+    with _KIT_LOCK:
+        if _KIT is None:
+            # Lazy import to avoid I2C contention with ADS1115
+            import board
+            from adafruit_motorkit import MotorKit
+
+            _KIT = MotorKit(i2c=board.I2C())
+        return _KIT
+
+
 def run_dosing_pump(adjustment):
     """
     Run a dosing pump based on pH adjustment decision.
@@ -101,19 +243,15 @@ def run_dosing_pump(adjustment):
 
     Motor 1 = pH Down (FloraMicro)
     Motor 2 = pH Up (FloraGrow)
-    MotorKit imported lazily to avoid I2C contention during sensor reads.
+    MotorKit is created lazily (once) to avoid I2C contention during sensor reads.
     """
     if adjustment == "none":
         logger.info("No pH adjustment needed")
         return
 
-    # Lazy import to avoid I2C contention with ADS1115
-    import board
-    from adafruit_motorkit import MotorKit
-
     kit = None
     try:
-        kit = MotorKit(i2c=board.I2C())
+        kit = _get_motor_kit()
 
         if adjustment == "ph_down":
             pump = kit.motor1
@@ -1,25 +1,178 @@
 """
 camera.py - Webcam capture wrapper.
 Saves timestamped photos to data/photos/.
+Owns the process-wide VideoCapture (or Picamera2) shared with video_streamer.
 """
 
+import atexit
 import logging
 import os
-import time
 from datetime import datetime
 
-import cv2
-
 import config
 import data_store
 
+# cv2 and the optional JPEG encoders are imported inside the functions that
+# use them; OpenCV alone pulls in ~50 MB of shared libraries at import time.
+
 logger = logging.getLogger(__name__)
 
 
+# Shared capture handle, opened on first use and released at interpreter exit
+_CAP = None
+
+# Shared Picamera2 instance, used instead of _CAP when CAMERA_BACKEND == "picamera2"
+_PICAM = None
+
+# (frame, quality) -> JPEG bytes function, chosen on first encode
+_ENCODER = None
+
+
+def get_capture():
+    """
+    Return the shared webcam VideoCapture, opening it on first use.
+    Opening is slow, so one handle serves both the photo and the video
+    stream for the life of the process. V4L2 is requested explicitly to skip
+    the FFmpeg backend's input probing.
+
+    Returns:
+        cv2.VideoCapture, or None if the webcam could not be opened.
+    """
+    global _CAP
+    if _CAP is None:
+        import cv2
+
+        logger.info("Initializing camera (index %d)...", config.CAMERA_INDEX)
+        cap = cv2.VideoCapture(config.CAMERA_INDEX, cv2.CAP_V4L2)
+        if not cap.isOpened():
+            cap.release()
+            return None
+
+        # Request MJPEG from the driver: compressed frames cross the USB bus
+        # instead of raw YUYV, which also skips the per-frame YUYV->BGR convert
+        if not cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG')):
+            logger.warning("Camera backend rejected MJPG FOURCC, using default format")
+        cap.set(cv2.CAP_PROP_FPS, config.VIDEO_HW_FPS)
+
+        # Keep only the freshest frame queued so reads don't return stale buffers
+        if not cap.set(cv2.CAP_PROP_BUFFERSIZE, config.CAMERA_BUFFER_SIZE):
+            logger.warning("Camera backend ignored BUFFERSIZE=%d", config.CAMERA_BUFFER_SIZE)
+
+        atexit.register(cap.release)
+        _CAP = cap
+    return _CAP
+
+
+def get_picamera2():
+    """
+    Return the shared, started Picamera2 instance, opening it on first use.
+    libcamera fills DMABUF-backed buffers that the ISP and the hardware
+    encoder read directly, so frames never pass through a userspace
+    colour conversion.
+
+    Returns:
+        picamera2.Picamera2, or None if picamera2 or the camera is unavailable.
+    """
+    global _PICAM
+    if _PICAM is None:
+        try:
+            from picamera2 import Picamera2
+        except ImportError:
+            logger.warning("picamera2 not installed, cannot use CSI camera")
+            return None
+
+        logger.info("Initializing Picamera2...")
+        try:
+            picam = Picamera2()
+            picam.configure(picam.create_video_configuration(
+                main={"size": (config.VIDEO_WIDTH, config.VIDEO_HEIGHT)},
+                controls={"FrameRate": config.VIDEO_HW_FPS},
+            ))
+            picam.start()
+        except (IndexError, RuntimeError) as e:
+            logger.warning("Could not start Picamera2: %s", e)
+            return None
+
+        atexit.register(picam.close)
+        _PICAM = picam
+    return _PICAM
+
+
+def _encode_opencv(frame, quality):
+    """Encode with OpenCV's bundled libjpeg."""
+    import cv2
+
+    # Baseline, non-optimized Huffman: the cheapest libjpeg encode path
+    params = [int(cv2.IMWRITE_JPEG_QUALITY), quality,
+              int(cv2.IMWRITE_JPEG_OPTIMIZE), 0,
+              int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0]
+    result, encoded = cv2.imencode('.jpg', frame, params)
+    return encoded.tobytes() if result else None
+
+
+def _select_encoder():
+    """Pick the fastest available JPEG encoder: nvjpeg, TurboJPEG, then OpenCV."""
+    # Optional: NVIDIA nvjpeg bindings (pip install pynvjpeg) for GPU encode on Jetson
+    try:
+        from nvjpeg import NvJpeg
+        nj = NvJpeg()
+        logger.info("Using nvjpeg GPU encoder")
+        return lambda frame, quality: nj.encode(frame, quality)
+    except ImportError:
+        pass
+    except Exception as e:
+        # Bindings present but no usable CUDA device/driver
+        logger.warning("nvjpeg unavailable (%s)", e)
+
+    # Optional: libjpeg-turbo bindings (pip install PyTurboJPEG) with SIMD DCT
+    try:
+        from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+        tj = TurboJPEG()
+        return lambda frame, quality: tj.encode(
+            frame, quality=quality, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420
+        )
+    except ImportError:
+        pass
+    except OSError as e:
+        # Python bindings present but libturbojpeg itself is missing
+        logger.warning("TurboJPEG unavailable (%s), using OpenCV encoder", e)
+
+    return _encode_opencv
+
+
+def encode_jpeg(frame, quality=None):
+    """
+    Encode a BGR frame to JPEG using the fastest available encoder
+    (nvjpeg on the GPU, then TurboJPEG, then OpenCV).
+
+    Args:
+        frame: BGR ndarray.
+        quality: JPEG quality (0-100), defaults to config.PHOTO_JPEG_QUALITY.
+
+    Returns:
+        bytes of the encoded JPEG, or None on failure.
+    """
+    global _ENCODER
+    if _ENCODER is None:
+        _ENCODER = _select_encoder()
+
+    if quality is None:
+        quality = config.PHOTO_JPEG_QUALITY
+    return _ENCODER(frame, quality)
+
+
+def is_mjpeg(cap):
+    """True if the capture is delivering MJPEG-compressed frames."""
+    import cv2
+
+    return int(cap.get(cv2.CAP_PROP_FOURCC)) == cv2.VideoWriter_fourcc(*'MJPG')
+
+
 def capture_photo():
     """
-    Capture a single photo from the USB webcam.
-    Warms up 10 frames, captures final frame.
+    Capture a single photo from the USB webcam (or the CSI camera when
+    CAMERA_BACKEND is "picamera2").
+    Warms up CAMERA_WARMUP_FRAMES frames, captures final frame.
 
     Returns:
         str filepath of saved photo, or None on failure.
@@ -31,27 +184,78 @@ def capture_photo():
     filename = f"webcam_{timestamp}.jpg"
     filepath = os.path.join(config.PHOTOS_DIR, filename)
 
-    logger.info("Initializing camera (index %d)...", config.CAMERA_INDEX)
-    cap = cv2.VideoCapture(config.CAMERA_INDEX)
+    if config.CAMERA_BACKEND == "picamera2":
+        return _capture_photo_picamera2(filepath)
 
-    if not cap.isOpened():
+    import cv2
+
+    cap = get_capture()
+    if cap is None:
         logger.warning("Could not open webcam, falling back to latest photo")
         return data_store.get_latest_photo()
 
+    # With an MJPEG source, ask for the driver's compressed buffer as-is so
+    # the photo can be written without a decode/re-encode round trip
+    raw = is_mjpeg(cap) and cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
     try:
-        # Warm up for auto-exposure adjustment
+        # Warm up for auto-exposure adjustment. grab() advances the stream
+        # without decoding, so only the final frame is decoded by retrieve().
         logger.debug("Warming up camera (%d frames)...", config.CAMERA_WARMUP_FRAMES)
-        for _ in range(config.CAMERA_WARMUP_FRAMES):
-            cap.read()
-            time.sleep(0.1)
+        for _ in range(config.CAMERA_WARMUP_FRAMES + 1):
+            cap.grab()
 
-        ret, frame = cap.read()
-        if ret:
-            cv2.imwrite(filepath, frame)
+        ret, frame = cap.retrieve()
+    finally:
+        if raw:
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+
+    if ret:
+        if not raw:
+            data = encode_jpeg(frame)
+        else:
+            # A raw MJPEG buffer is normally a complete JPEG (SOI marker
+            # present). Without one it is still undecoded driver bytes, not
+            # pixels: decode it if possible, else treat the capture as failed.
+            data = frame.tobytes()
+            if not data.startswith(b"\xff\xd8"):
+                decoded = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+                data = encode_jpeg(decoded) if decoded is not None else None
+
+        if data:
+            with open(filepath, "wb") as f:
+                f.write(data)
             logger.info("Photo saved: %s", filepath)
+            try:
+                data_store.update_latest_photo(filepath)
+            except OSError as e:
+                logger.warning("Could not update latest photo link: %s", e)
             return filepath
-        else:
-            logger.warning("Failed to capture frame, falling back to latest photo")
-            return data_store.get_latest_photo()
-    finally:
-        cap.release()
+
+    logger.warning("Failed to capture frame, falling back to latest photo")
+    return data_store.get_latest_photo()
+
+
+def _capture_photo_picamera2(filepath):
+    """Capture a photo through Picamera2, mirroring capture_photo()."""
+    picam = get_picamera2()
+    if picam is None:
+        logger.warning("Could not open Pi camera, falling back to latest photo")
+        return data_store.get_latest_photo()
+
+    try:
+        # Wait out auto-exposure on metadata only; no pixel data is copied
+        for _ in range(config.CAMERA_WARMUP_FRAMES):
+            picam.capture_metadata()
+        picam.options["quality"] = config.PHOTO_JPEG_QUALITY
+        picam.capture_file(filepath)
+    except (OSError, RuntimeError) as e:
+        logger.warning("Failed to capture frame (%s), falling back to latest photo", e)
+        return data_store.get_latest_photo()
+
+    logger.info("Photo saved: %s", filepath)
+    try:
+        data_store.update_latest_photo(filepath)
+    except OSError as e:
+        logger.warning("Could not update latest photo link: %s", e)
+    return filepath
@@ -11,8 +11,11 @@ import os
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 PHOTOS_DIR = os.path.join(DATA_DIR, "photos")
+LATEST_PHOTO = os.path.join(PHOTOS_DIR, "latest.jpg")  # Symlink to the newest capture
+CYCLE_COUNTER_FILE = os.path.join(DATA_DIR, ".cycle_counter")  # Cycles since last Gemini call
 SENSOR_LOG_CSV = os.path.join(DATA_DIR, "sensor_log.csv")
-DECISIONS_JSON = os.path.join(DATA_DIR, "decisions.json")
+DECISIONS_JSONL = os.path.join(DATA_DIR, "decisions.jsonl")
+DECISIONS_JSON = os.path.join(DATA_DIR, "decisions.json")  # Legacy array format, migrated to JSONL
 LOG_FILE = os.path.join(DATA_DIR, "hydroponics.log")
 DASHBOARD_HTML = os.path.join(DATA_DIR, "dashboard.html")
 DEVICES_JSON = os.path.join(PROJECT_ROOT, "devices.json")
@@ -32,8 +35,8 @@ ADS1115_PH_CHANNEL = 1
 READINGS_PER_SENSOR = 5         # Total reads per sensor
 READINGS_TO_DISCARD = 2         # Discard first N reads
 INTRA_SENSOR_DELAY = 2.0        # Seconds between reads of the same sensor
-INTER_SENSOR_DELAY = 5.0        # Seconds between different sensors
 PH_TDS_DELAY = 0.15             # 150ms between pH and TDS reads
+DS18B20_RESOLUTION = 9          # Bits (9-12): 9 converts in ~94ms vs ~750ms at 12 (0.5 C steps)
 
 # =============================================================================
 # SENSOR VALIDATION RANGES
@@ -49,6 +52,15 @@ WATER_TEMP_MAX = 50.0
 HUMIDITY_MIN = 5.0
 HUMIDITY_MAX = 100.0
 
+# Same limits keyed by SensorReadings field, for table-driven checks
+VALID_RANGES = {
+    "air_temp_c": (AIR_TEMP_MIN, AIR_TEMP_MAX),
+    "humidity_pct": (HUMIDITY_MIN, HUMIDITY_MAX),
+    "water_temp_c": (WATER_TEMP_MIN, WATER_TEMP_MAX),
+    "ph": (PH_MIN, PH_MAX),
+    "tds_ppm": (TDS_MIN, TDS_MAX),
+}
+
 # =============================================================================
 # TUYA SMART PLUG
 # =============================================================================
@@ -59,7 +71,10 @@ TUYA_VERSION = 3.3
 DPS_LIGHT = "1"
 DPS_AIR_PUMP = "2"
 DPS_HUMIDIFIER = "3"
-TUYA_COMMAND_DELAY = 0.5  # Seconds between plug commands
+TUYA_COMMAND_DELAY = 0.5  # Seconds between command retries
+TUYA_COMMAND_RETRIES = 2  # Extra attempts after a failed plug command
+TUYA_SOCKET_TIMEOUT = 3   # Seconds before a plug command times out
+TUYA_HEARTBEAT_INTERVAL = 30  # Seconds between keep-alives on the persistent socket
 HUMIDIFIER_DURATION_SECONDS = 300  # 5 minutes
 
 # =============================================================================
@@ -74,12 +89,17 @@ DOSING_DURATION = 5      # Seconds per pump activation
 GEMINI_MODEL = "gemini-3-flash-preview"
 GEMINI_TEMPERATURE = 0.2
 PAST_DECISIONS_COUNT = 3  # Number of past decisions to include in prompt
+GEMINI_IMAGE_MAX_EDGE = 1024  # Photo is downscaled to this longest edge (pixels) before sending
+CALL_GEMINI_EVERY_N_CYCLES = 3  # Query Gemini at least every N cycles; nominal cycles between use rules (1 = always)
 
 # =============================================================================
 # CAMERA
 # =============================================================================
 CAMERA_INDEX = 0
-CAMERA_WARMUP_FRAMES = 10
+CAMERA_BACKEND = "opencv"     # "opencv" (USB webcam) or "picamera2" (CSI camera via libcamera)
+CAMERA_WARMUP_FRAMES = 3     # Frames discarded while auto-exposure settles
+CAMERA_BUFFER_SIZE = 1       # Driver frame queue depth (1 = always freshest frame)
+PHOTO_JPEG_QUALITY = 85      # Re-encode quality when the camera isn't MJPEG (0-100)
 
 # =============================================================================
 # VIDEO STREAMING
@@ -93,6 +113,8 @@ VIDEO_HEIGHT = 1080                   # Frame height (pixels)
 VIDEO_FPS = 5                         # Target transmission FPS
 VIDEO_HW_FPS = 5                      # Hardware capture FPS
 VIDEO_JPEG_QUALITY = 95               # JPEG compression quality (0-100)
+VIDEO_SKIP_STATIC_FRAMES = True       # Send a repeat marker instead of unchanged frames
+VIDEO_STATIC_HASH_BITS = 4            # Max differing bits (of 1024) to count as unchanged
 
 # =============================================================================
 # LIGHT SCHEDULE (24-hour format)
@@ -1,15 +1,39 @@
 """
-data_store.py - CSV logging, decision JSON persistence, photo lookup.
+data_store.py - CSV logging, decision JSONL persistence, photo lookup.
 """
 
 import csv
 import json
+import mmap
 import os
-import glob
 from datetime import datetime
 
 import config
 
+# Optional: orjson (pip install orjson) is a C/SIMD JSON codec, several times
+# faster than the stdlib. Output stays compact single-line JSON for JSONL.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+_SENSOR_CSV_HEADER = "timestamp,air_temp_c,humidity_pct,water_temp_c,ph,tds_ppm\r\n"
+
+# Cached at import so each append skips the stat; the process owns the file
+_HEADERS_WRITTEN = os.path.exists(config.SENSOR_LOG_CSV)
+
+
+def _csv_value(x):
+    """None becomes an empty field (pandas-friendly)."""
+    return "" if x is None else x
+
 
 def ensure_data_dirs():
     """Create data directories if they don't exist."""
@@ -25,30 +49,91 @@ def append_sensor_reading(readings):
     Args:
         readings: SensorReadings dataclass instance
     """
+    global _HEADERS_WRITTEN
     ensure_data_dirs()
-    headers = ["timestamp", "air_temp_c", "humidity_pct", "water_temp_c", "ph", "tds_ppm"]
-    file_exists = os.path.exists(config.SENSOR_LOG_CSV)
-
-    with open(config.SENSOR_LOG_CSV, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(headers)
-
-        # None values become empty strings (pandas-friendly)
-        row = [
-            readings.timestamp,
-            readings.air_temp_c if readings.air_temp_c is not None else "",
-            readings.humidity_pct if readings.humidity_pct is not None else "",
-            readings.water_temp_c if readings.water_temp_c is not None else "",
-            readings.ph if readings.ph is not None else "",
-            readings.tds_ppm if readings.tds_ppm is not None else "",
-        ]
-        writer.writerow(row)
+
+    # Numeric fields can't contain commas, so no csv quoting is needed.
+    # CRLF matches the csv.writer rows already in existing logs.
+    row = (f"{readings.timestamp},{_csv_value(readings.air_temp_c)},"
+           f"{_csv_value(readings.humidity_pct)},{_csv_value(readings.water_temp_c)},"
+           f"{_csv_value(readings.ph)},{_csv_value(readings.tds_ppm)}\r\n")
+
+    with open(config.SENSOR_LOG_CSV, "a", newline="", buffering=8192) as f:
+        if not _HEADERS_WRITTEN:
+            f.write(_SENSOR_CSV_HEADER)
+            _HEADERS_WRITTEN = True
+        f.write(row)
+
+
+def _migrate_legacy_decisions():
+    """
+    One-shot conversion of the legacy decisions.json array to JSONL.
+    Runs only while the JSONL file doesn't exist yet; the old file is left in place.
+    """
+    if os.path.exists(config.DECISIONS_JSONL) or not os.path.exists(config.DECISIONS_JSON):
+        return
+
+    try:
+        with open(config.DECISIONS_JSON, "rb") as f:
+            decisions = _json_loads(f.read())
+    except (json.JSONDecodeError, IOError):
+        return
+
+    # Write to a temp file first so a crash can't leave a half-migrated log
+    tmp_path = config.DECISIONS_JSONL + ".tmp"
+    with open(tmp_path, "w") as f:
+        for decision in decisions:
+            f.write(_json_dumps(decision) + "\n")
+    os.replace(tmp_path, config.DECISIONS_JSONL)
+
+
+def _read_last_lines(path, n):
+    """
+    Return the last n complete, non-empty lines of a file as bytes, most
+    recent last. An unterminated tail (a write cut off mid-line) is not
+    counted toward n. Memory-maps the file and scans backwards for newlines,
+    so only the pages holding those lines are touched regardless of file length.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Everything after the last newline is a partial line; skip it
+            end = mm.rfind(b"\n") + 1
+            # n+1 newlines back guarantees the first of the last n lines is complete
+            pos = end
+            for _ in range(n + 1):
+                pos = mm.rfind(b"\n", 0, pos)
+                if pos < 0:
+                    break
+            data = mm[pos + 1:end]
+
+    return [line for line in data.splitlines() if line.strip()][-n:]
+
+
+def tail_sensor_csv(n):
+    """
+    Return the last n rows of the sensor CSV without reading the whole file.
+
+    Args:
+        n: Number of rows to return
+
+    Returns:
+        List of rows (lists of str, header excluded), most recent last
+    """
+    if n <= 0 or not os.path.exists(config.SENSOR_LOG_CSV):
+        return []
+
+    header = _SENSOR_CSV_HEADER.rstrip().split(",")
+    # One extra line in case the file is short enough to include the header
+    lines = _read_last_lines(config.SENSOR_LOG_CSV, n + 1)
+    rows = [row for row in csv.reader(line.decode() for line in lines) if row != header]
+    return rows[-n:]
 
 
 def load_past_decisions(n=3):
     """
-    Load the last N decisions from the decisions JSON file.
+    Load the last N decisions from the decisions JSONL file.
 
     Args:
         n: Number of past decisions to load
@@ -56,20 +141,28 @@ def load_past_decisions(n=3):
     Returns:
         List of decision dicts, most recent last
     """
-    if not os.path.exists(config.DECISIONS_JSON):
+    _migrate_legacy_decisions()
+    if n <= 0 or not os.path.exists(config.DECISIONS_JSONL):
         return []
 
     try:
-        with open(config.DECISIONS_JSON, "r") as f:
-            decisions = json.load(f)
-        return decisions[-n:]
-    except (json.JSONDecodeError, IOError):
+        lines = _read_last_lines(config.DECISIONS_JSONL, n)
+    except IOError:
         return []
 
+    decisions = []
+    for line in lines:
+        try:
+            decisions.append(_json_loads(line))
+        except json.JSONDecodeError:
+            # Torn line from an interrupted write; skip it
+            continue
+    return decisions
+
 
 def save_decision(decision, readings):
     """
-    Append a decision to the decisions JSON file.
+    Append a decision to the decisions JSONL file (one JSON object per line).
     Adds timestamp and sensor_snapshot fields.
 
     Args:
@@ -77,6 +170,7 @@ def save_decision(decision, readings):
         readings: SensorReadings dataclass instance
     """
     ensure_data_dirs()
+    _migrate_legacy_decisions()
 
     decision["timestamp"] = datetime.now().isoformat()
     decision["sensor_snapshot"] = {
@@ -87,29 +181,58 @@ def save_decision(decision, readings):
         "tds_ppm": readings.tds_ppm,
     }
 
-    # Load existing decisions
-    decisions = []
-    if os.path.exists(config.DECISIONS_JSON):
-        try:
-            with open(config.DECISIONS_JSON, "r") as f:
-                decisions = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            decisions = []
+    # Constant-time append instead of re-reading and rewriting the whole history
+    with open(config.DECISIONS_JSONL, "a") as f:
+        f.write(_json_dumps(decision) + "\n")
 
-    decisions.append(decision)
 
-    with open(config.DECISIONS_JSON, "w") as f:
-        json.dump(decisions, f, indent=2)
+def update_latest_photo(photo_path):
+    """
+    Point the latest.jpg symlink at photo_path.
+    The new link is created beside it and swapped in with os.replace, so
+    readers never see a missing or half-written link.
+    """
+    tmp_path = config.LATEST_PHOTO + ".tmp"
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+    # Relative target so the data directory can be moved or copied
+    os.symlink(os.path.basename(photo_path), tmp_path)
+    os.replace(tmp_path, config.LATEST_PHOTO)
 
 
 def get_latest_photo():
     """
     Return the path to the most recent photo in the photos directory.
+    Resolves the latest.jpg symlink; scans the directory only if the link is
+    missing or dangling (e.g. photos taken before it existed).
 
     Returns:
         str path or None
     """
-    photos = glob.glob(os.path.join(config.PHOTOS_DIR, "*.jpg"))
-    if not photos:
+    if os.path.exists(config.LATEST_PHOTO):
+        return os.path.realpath(config.LATEST_PHOTO)
+
+    # One pass over the directory; DirEntry type info comes from readdir,
+    # so only the .jpg regular files (not the symlink) get a stat()
+    latest = None
+    latest_mtime = -1.0
+    try:
+        with os.scandir(config.PHOTOS_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jpg") and entry.is_file(follow_symlinks=False):
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest, latest_mtime = entry.path, mtime
+    except FileNotFoundError:
+        return None
+    if latest is None:
         return None
-    return max(photos, key=os.path.getmtime)
+
+    # Seed the link so later lookups skip the scan
+    try:
+        update_latest_photo(latest)
+    except OSError:
+        pass
+    return latest
@@ -2,55 +2,59 @@
 gemini_client.py - Prompt builder, Gemini API call, and JSON response parsing.
 
 Uses native JSON mode via response_mime_type="application/json" + response schema.
-Falls back to safe defaults on API failure.
+Falls back to safe defaults on API failure. Between periodic Gemini calls,
+cycles where every reading is nominal are decided by local rules.
 """
 
-import json
 import logging
 import os
 from datetime import datetime
+from typing import Literal
 
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from pydantic import BaseModel, Field
+
+# Optional: orjson (pip install orjson) parses the response several times faster
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 import config
 
 logger = logging.getLogger(__name__)
 
-# Response schema enforced via Gemini JSON mode
-RESPONSE_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "light": {"type": "string", "enum": ["on", "off"]},
-        "air_pump": {"type": "string", "enum": ["on", "off"]},
-        "humidifier": {"type": "string", "enum": ["on", "off"]},
-        "ph_adjustment": {"type": "string", "enum": ["none", "ph_up", "ph_down"]},
-        "reasoning": {
-            "type": "object",
-            "properties": {
-                "overall": {"type": "string"},
-                "light_reason": {"type": "string"},
-                "air_pump_reason": {"type": "string"},
-                "humidifier_reason": {"type": "string"},
-                "ph_reason": {"type": "string"},
-            },
-            "required": ["overall", "light_reason", "air_pump_reason",
-                         "humidifier_reason", "ph_reason"],
-        },
-        "plant_health_score": {"type": "integer", "minimum": 0, "maximum": 10},
-        "human_intervention": {
-            "type": "object",
-            "properties": {
-                "needed": {"type": "boolean"},
-                "message": {"type": "string"},
-            },
-            "required": ["needed", "message"],
-        },
-    },
-    "required": ["light", "air_pump", "humidifier", "ph_adjustment",
-                  "reasoning", "plant_health_score", "human_intervention"],
-}
+OnOff = Literal["on", "off"]
+
+
+class Reasoning(BaseModel):
+    """Per-actuator explanation of a decision."""
+    overall: str
+    light_reason: str
+    air_pump_reason: str
+    humidifier_reason: str
+    ph_reason: str
+
+
+class HumanIntervention(BaseModel):
+    """Flag raised when the grower needs to check the system."""
+    needed: bool
+    message: str
+
+
+class Decision(BaseModel):
+    """Structured decision returned by Gemini in JSON mode."""
+    light: OnOff
+    air_pump: OnOff
+    humidifier: OnOff
+    ph_adjustment: Literal["none", "ph_up", "ph_down"]
+    reasoning: Reasoning
+    plant_health_score: int = Field(ge=0, le=10)
+    human_intervention: HumanIntervention
+
+
+# Response schema enforced via Gemini JSON mode. A pydantic class is
+# converted once by the SDK instead of re-walking a dict on every call.
+RESPONSE_SCHEMA = Decision
 
 SAFE_FALLBACK = {
     "light": "on",
@@ -72,8 +76,19 @@ SAFE_FALLBACK = {
 }
 
 
-def _init_client():
-    """Initialize the Vertex AI Gemini client."""
+# .env is read once per process; the client is reused across calls
+_ENV_LOADED = False
+_CLIENT = None
+
+
+def _load_env_once():
+    """Load .env and resolve a relative credentials path, once per process."""
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+
+    from dotenv import load_dotenv
+
     load_dotenv(config.ENV_FILE, override=True)
 
     creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -81,56 +96,52 @@ def _init_client():
         creds_path = os.path.join(config.PROJECT_ROOT, creds_path)
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = creds_path
 
-    project_id = os.getenv("GCP_PROJECT_ID")
-    location = os.getenv("GCP_LOCATION", "global")
+    _ENV_LOADED = True
 
-    if not project_id:
-        raise ValueError("GCP_PROJECT_ID not found in .env file")
 
-    return genai.Client(vertexai=True, project=project_id, location=location)
+def _init_client():
+    """Return the shared Vertex AI Gemini client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+
+    # Lazy import: google-genai is heavy and only needed once per cycle
+    from google import genai
 
+    _load_env_once()
 
-def _format_sensor_value(value, unit=""):
-    """Format a sensor value for the prompt, showing N/A if None."""
-    if value is None:
-        return "N/A (sensor error)"
-    return f"{value}{unit}"
+    project_id = os.getenv("GCP_PROJECT_ID")
+    location = os.getenv("GCP_LOCATION", "global")
 
+    if not project_id:
+        raise ValueError("GCP_PROJECT_ID not found in .env file")
 
-def _build_prompt(readings, past_decisions):
-    """
-    Build the text prompt for Gemini including:
-    - Basil DWC context and ideal ranges
-    - Current time for light cycle awareness
-    - Sensor data
-    - Past 3 decisions with per-actuator reasoning
-    """
-    now = datetime.now()
-    current_hour = now.hour
+    # generate_content is safe to call concurrently on one client
+    _CLIENT = genai.Client(vertexai=True, project=project_id, location=location)
+    return _CLIENT
 
-    # Determine if we're in the light period
-    in_light_period = config.LIGHTS_ON_HOUR <= current_hour < config.LIGHTS_OFF_HOUR
 
-    prompt = f"""You are an AI hydroponics controller managing a basil plant in a Deep Water Culture (DWC) system inside a grow tent.
+# Static prompt text, parsed once at import; only the {slots} vary per call
+_PROMPT_TEMPLATE = """You are an AI hydroponics controller managing a basil plant in a Deep Water Culture (DWC) system inside a grow tent.
 
 ## Current Conditions
-- **Date/Time**: {now.strftime('%Y-%m-%d %H:%M')}
-- **Light Schedule**: {config.LIGHTS_ON_HOUR}:00 - {config.LIGHTS_OFF_HOUR}:00 (16h on / 8h off)
-- **Currently**: {'DAYTIME (lights should be ON)' if in_light_period else 'NIGHTTIME (lights should be OFF)'}
+- **Date/Time**: {now}
+- **Light Schedule**: {lights_on}:00 - {lights_off}:00 (16h on / 8h off)
+- **Currently**: {period}
 
 ## Sensor Readings
-- Air Temperature: {_format_sensor_value(readings.air_temp_c, ' C')}
-- Humidity: {_format_sensor_value(readings.humidity_pct, '%')}
-- Water Temperature: {_format_sensor_value(readings.water_temp_c, ' C')}
-- pH: {_format_sensor_value(readings.ph)}
-- TDS: {_format_sensor_value(readings.tds_ppm, ' ppm')}
+- Air Temperature: {air_temp}
+- Humidity: {humidity}
+- Water Temperature: {water_temp}
+- pH: {ph}
+- TDS: {tds}
 
 ## Ideal Ranges for Basil (DWC)
-- Air Temperature: {config.IDEAL_RANGES['air_temp_c']['min']}-{config.IDEAL_RANGES['air_temp_c']['max']} C
-- Humidity: {config.IDEAL_RANGES['humidity_pct']['min']}-{config.IDEAL_RANGES['humidity_pct']['max']}%
-- Water Temperature: {config.IDEAL_RANGES['water_temp_c']['min']}-{config.IDEAL_RANGES['water_temp_c']['max']} C
-- pH: {config.IDEAL_RANGES['ph']['min']}-{config.IDEAL_RANGES['ph']['max']}
-- TDS: {config.IDEAL_RANGES['tds_ppm']['min']}-{config.IDEAL_RANGES['tds_ppm']['max']} ppm
+- Air Temperature: {air_temp_c_min}-{air_temp_c_max} C
+- Humidity: {humidity_pct_min}-{humidity_pct_max}%
+- Water Temperature: {water_temp_c_min}-{water_temp_c_max} C
+- pH: {ph_min}-{ph_max}
+- TDS: {tds_ppm_min}-{tds_ppm_max} ppm
 
 ## Available Controls
 1. **Light** (on/off) - VIPARSPECTRA P1000 LED grow light
@@ -149,25 +160,7 @@ def _build_prompt(readings, past_decisions):
 - Explain EACH actuator decision individually in the reasoning fields
 """
 
-    if past_decisions:
-        prompt += "\n## Past Decisions (most recent last)\n"
-        for i, dec in enumerate(past_decisions, 1):
-            ts = dec.get("timestamp", "unknown")
-            snapshot = dec.get("sensor_snapshot", {})
-            reasoning = dec.get("reasoning", {})
-            prompt += f"\n### Decision {i} ({ts})\n"
-            prompt += f"- Sensors: pH={snapshot.get('ph', 'N/A')}, TDS={snapshot.get('tds_ppm', 'N/A')}, "
-            prompt += f"Air={snapshot.get('air_temp_c', 'N/A')}C, Water={snapshot.get('water_temp_c', 'N/A')}C, "
-            prompt += f"Humidity={snapshot.get('humidity_pct', 'N/A')}%\n"
-            prompt += f"- Actions: light={dec.get('light')}, air_pump={dec.get('air_pump')}, "
-            prompt += f"humidifier={dec.get('humidifier')}, ph_adjustment={dec.get('ph_adjustment')}\n"
-            prompt += f"- Overall reasoning: {reasoning.get('overall', 'N/A')}\n"
-            prompt += f"- Light reason: {reasoning.get('light_reason', 'N/A')}\n"
-            prompt += f"- Air pump reason: {reasoning.get('air_pump_reason', 'N/A')}\n"
-            prompt += f"- Humidifier reason: {reasoning.get('humidifier_reason', 'N/A')}\n"
-            prompt += f"- pH reason: {reasoning.get('ph_reason', 'N/A')}\n"
-
-    prompt += """
+_PROMPT_TRAILER = """
 ## Photo
 A photo of the plant is attached. Consider visible plant health in your assessment.
 
@@ -177,7 +170,161 @@ Analyze the current conditions and photo, then decide what actions to take. Expl
 **Important**: Provide a `plant_health_score` from 0-10 (where 0 = critical/dying, 5 = fair/acceptable, 10 = excellent/thriving) based on the sensor readings and visual plant health in the photo.
 """
 
-    return prompt
+# Ideal-range placeholders ({air_temp_c_min}, ...) are constant per process
+_IDEAL_RANGE_SLOTS = {
+    f"{name}_{bound}": limits[bound]
+    for name, limits in config.IDEAL_RANGES.items()
+    for bound in ("min", "max")
+}
+
+
+def _format_sensor_value(value, unit=""):
+    """Format a sensor value for the prompt, showing N/A if None."""
+    if value is None:
+        return "N/A (sensor error)"
+    return f"{value}{unit}"
+
+
+def _fmt_past_decision(i, dec):
+    """Format one past decision (sensors, actions, reasoning) for the prompt."""
+    snapshot = dec.get("sensor_snapshot", {})
+    reasoning = dec.get("reasoning", {})
+    return (
+        f"### Decision {i} ({dec.get('timestamp', 'unknown')})\n"
+        f"- Sensors: pH={snapshot.get('ph', 'N/A')}, TDS={snapshot.get('tds_ppm', 'N/A')}, "
+        f"Air={snapshot.get('air_temp_c', 'N/A')}C, Water={snapshot.get('water_temp_c', 'N/A')}C, "
+        f"Humidity={snapshot.get('humidity_pct', 'N/A')}%\n"
+        f"- Actions: light={dec.get('light')}, air_pump={dec.get('air_pump')}, "
+        f"humidifier={dec.get('humidifier')}, ph_adjustment={dec.get('ph_adjustment')}\n"
+        f"- Overall reasoning: {reasoning.get('overall', 'N/A')}\n"
+        f"- Light reason: {reasoning.get('light_reason', 'N/A')}\n"
+        f"- Air pump reason: {reasoning.get('air_pump_reason', 'N/A')}\n"
+        f"- Humidifier reason: {reasoning.get('humidifier_reason', 'N/A')}\n"
+        f"- pH reason: {reasoning.get('ph_reason', 'N/A')}\n"
+    )
+
+
+def _build_prompt(readings, past_decisions):
+    """
+    Build the text prompt for Gemini including:
+    - Basil DWC context and ideal ranges
+    - Current time for light cycle awareness
+    - Sensor data
+    - Past 3 decisions with per-actuator reasoning
+    """
+    now = datetime.now()
+    current_hour = now.hour
+
+    # Determine if we're in the light period
+    in_light_period = config.LIGHTS_ON_HOUR <= current_hour < config.LIGHTS_OFF_HOUR
+
+    parts = [_PROMPT_TEMPLATE.format(
+        now=now.strftime('%Y-%m-%d %H:%M'),
+        lights_on=config.LIGHTS_ON_HOUR,
+        lights_off=config.LIGHTS_OFF_HOUR,
+        period='DAYTIME (lights should be ON)' if in_light_period else 'NIGHTTIME (lights should be OFF)',
+        air_temp=_format_sensor_value(readings.air_temp_c, ' C'),
+        humidity=_format_sensor_value(readings.humidity_pct, '%'),
+        water_temp=_format_sensor_value(readings.water_temp_c, ' C'),
+        ph=_format_sensor_value(readings.ph),
+        tds=_format_sensor_value(readings.tds_ppm, ' ppm'),
+        **_IDEAL_RANGE_SLOTS,
+    )]
+
+    if past_decisions:
+        parts.append("\n## Past Decisions (most recent last)\n\n")
+        parts.append("\n".join(
+            _fmt_past_decision(i, dec) for i, dec in enumerate(past_decisions, 1)
+        ))
+
+    parts.append(_PROMPT_TRAILER)
+    # One allocation for the whole prompt instead of a new str per +=
+    return "".join(parts)
+
+
+def _load_image_bytes(photo_path):
+    """
+    Return JPEG bytes for the photo, downscaled so its longest edge is at most
+    GEMINI_IMAGE_MAX_EDGE. Gemini tiles images internally, so a full 1080p
+    upload adds bytes without adding detail. Sent as-is if cv2 is unavailable.
+    """
+    with open(photo_path, "rb") as f:
+        image_bytes = f.read()
+
+    try:
+        import cv2
+        import numpy as np
+        from camera import encode_jpeg
+
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            h, w = img.shape[:2]
+            scale = config.GEMINI_IMAGE_MAX_EDGE / max(h, w)
+            if scale < 1:
+                img = cv2.resize(img, (round(w * scale), round(h * scale)),
+                                 interpolation=cv2.INTER_AREA)
+                image_bytes = encode_jpeg(img) or image_bytes
+    except ImportError:
+        pass
+
+    return image_bytes
+
+
+def _read_cycle_counter():
+    """Return the number of cycles since Gemini was last queried (0 if unknown)."""
+    try:
+        with open(config.CYCLE_COUNTER_FILE, "r") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_cycle_counter(value):
+    """Persist the cycles-since-Gemini counter across cron invocations."""
+    try:
+        with open(config.CYCLE_COUNTER_FILE, "w") as f:
+            f.write(str(value))
+    except OSError as e:
+        logger.warning("Could not write cycle counter: %s", e)
+
+
+def _rule_based_decision(readings, past_decisions):
+    """
+    Return a decision without calling Gemini when the guidelines already make
+    it obvious: daytime, every sensor inside its ideal range, and pH within
+    0.5 of mid-range. Returns None when the model's judgement is needed.
+    """
+    now = datetime.now()
+    if not (config.LIGHTS_ON_HOUR <= now.hour < config.LIGHTS_OFF_HOUR):
+        return None
+
+    for name, limits in config.IDEAL_RANGES.items():
+        value = getattr(readings, name, None)
+        if value is None or not (limits["min"] <= value <= limits["max"]):
+            return None
+
+    ph_limits = config.IDEAL_RANGES["ph"]
+    if abs(readings.ph - (ph_limits["min"] + ph_limits["max"]) / 2) > 0.5:
+        return None
+
+    # Carry the last model-assessed health score forward; no photo is judged here
+    score = past_decisions[-1].get("plant_health_score", 5) if past_decisions else 5
+
+    return {
+        "light": "on",
+        "air_pump": "on",
+        "humidifier": "off",
+        "ph_adjustment": "none",
+        "reasoning": {
+            "overall": "RULE-BASED: All sensors within ideal ranges during the light period. Gemini skipped this cycle.",
+            "light_reason": "Lights ON per the 16h/8h schedule.",
+            "air_pump_reason": "Air pump ON for oxygenation.",
+            "humidifier_reason": "Humidity within ideal range.",
+            "ph_reason": "pH within 0.5 of mid-range; no dosing.",
+        },
+        "plant_health_score": score,
+        "human_intervention": {"needed": False, "message": ""},
+    }
 
 
 def get_gemini_decision(readings, photo_path=None, past_decisions=None):
@@ -195,7 +342,19 @@ def get_gemini_decision(readings, photo_path=None, past_decisions=None):
     if past_decisions is None:
         past_decisions = []
 
+    # Between periodic Gemini calls, answer obvious all-in-range cycles locally
+    cycles_since_gemini = _read_cycle_counter() + 1
+    if cycles_since_gemini < config.CALL_GEMINI_EVERY_N_CYCLES:
+        decision = _rule_based_decision(readings, past_decisions)
+        if decision is not None:
+            logger.info("Conditions nominal, using rule-based decision (%d/%d cycles since Gemini)",
+                        cycles_since_gemini, config.CALL_GEMINI_EVERY_N_CYCLES)
+            _write_cycle_counter(cycles_since_gemini)
+            return decision
+
     try:
+        from google.genai import types
+
         client = _init_client()
         prompt_text = _build_prompt(readings, past_decisions)
 
@@ -204,8 +363,7 @@ def get_gemini_decision(readings, photo_path=None, past_decisions=None):
 
         # Add photo if available
         if photo_path and os.path.exists(photo_path):
-            with open(photo_path, "rb") as f:
-                image_bytes = f.read()
+            image_bytes = _load_image_bytes(photo_path)
             contents.append(
                 types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
             )
@@ -226,10 +384,11 @@ def get_gemini_decision(readings, photo_path=None, past_decisions=None):
             ),
         )
 
-        decision = json.loads(response.text)
+        decision = _json_loads(response.text)
         logger.info("Gemini decision received: light=%s, air_pump=%s, humidifier=%s, ph=%s",
                      decision.get("light"), decision.get("air_pump"),
                      decision.get("humidifier"), decision.get("ph_adjustment"))
+        _write_cycle_counter(0)
         return decision
 
     except Exception as e:
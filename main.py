@@ -20,12 +20,12 @@ Flow:
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
 
 import config
 import data_store
-from supabase_uploader import upload_decision
 
 # ---- Logging setup ----
 data_store.ensure_data_dirs()
@@ -56,7 +56,8 @@ def run():
         # Sanitize pH for Gemini / Safety
         # If pH is None (sensor error/out of hardware range) or extreme, default to 6.0
         # so Gemini sees a "perfect" value and takes no action.
-        if readings.ph is None or not (config.PH_MIN <= readings.ph <= config.PH_MAX):
+        ph_min, ph_max = config.VALID_RANGES["ph"]
+        if readings.ph is None or not (ph_min <= readings.ph <= ph_max):
             logger.warning("pH value %s out of normal range. Defaulting to 6.0.", readings.ph)
             readings.ph = 6.0
 
@@ -67,7 +68,7 @@ def run():
         logger.error("Sensor reading failed: %s", e)
         # Create a minimal readings object with Nones
         from sensors import SensorReadings
-        readings = SensorReadings(timestamp=datetime.now().isoformat())
+        readings = SensorReadings(timestamp=datetime.now().isoformat(timespec="seconds"))
         # Also default pH here just in case
         readings.ph = 6.0
 
@@ -129,14 +130,20 @@ def run():
     logger.info("Step 6: Storing decision...")
     try:
         data_store.save_decision(decision, readings)
-        logger.info("Decision saved to %s", config.DECISIONS_JSON)
+        logger.info("Decision saved to %s", config.DECISIONS_JSONL)
     except Exception as e:
         logger.error("Decision storage failed: %s", e)
 
     # --- Step 6b: Upload to Supabase ---
+    # Runs in the background so its HTTPS round trips overlap the Tuya/dosing
+    # commands of Step 7; joined once Step 7 is done.
     logger.info("Step 6b: Uploading to Supabase...")
+    upload_future = None
     try:
-        upload_decision(decision, readings, photo_path)
+        from supabase_uploader import upload_decision
+        upload_pool = ThreadPoolExecutor(max_workers=1)
+        upload_future = upload_pool.submit(upload_decision, decision, readings, photo_path)
+        upload_pool.shutdown(wait=False)
     except Exception as e:
         logger.error("Supabase upload failed: %s", e)
 
@@ -145,7 +152,7 @@ def run():
 
     # Smart plugs
     try:
-        from actuators import set_smart_plugs
+        from actuators import set_humidifier, set_smart_plugs
         humidifier_state = decision.get("humidifier", "off")
 
         set_smart_plugs(
@@ -154,29 +161,44 @@ def run():
             humidifier=humidifier_state,
         )
 
-        # If humidifier is ON, run it for 5 minutes then turn off
+        # If humidifier is ON, run it for 5 minutes then turn off.
+        # A timer lets the rest of the cycle proceed meanwhile; it is
+        # non-daemon, so the process still waits for it before exiting.
         if humidifier_state == "on":
             duration = config.HUMIDIFIER_DURATION_SECONDS
-            logger.info("Humidifier is ON. Keeping it ON for %d seconds...", duration)
-            time.sleep(duration)
-
-            # Turn humidifier OFF, keep others in their decided state
-            logger.info("Humidifier timer finished. Turning Humidifier OFF.")
-            set_smart_plugs(
-                light=decision.get("light", "on"),
-                air_pump=decision.get("air_pump", "on"),
-                humidifier="off",
-            )
+            logger.info("Humidifier is ON. Turning it OFF in %d seconds...", duration)
+
+            def humidifier_off():
+                # Only the humidifier DPS: the light may be on for video by now
+                logger.info("Humidifier timer finished. Turning Humidifier OFF.")
+                set_humidifier("off")
+
+            threading.Timer(duration, humidifier_off).start()
     except Exception as e:
         logger.error("Smart plug control failed: %s", e)
 
     # Dosing pump
+    # Runs in its own thread so the 5 s dose overlaps the upload wait and
+    # Steps 8-9; run_dosing_pump zeroes both motors itself on exit or error.
+    dosing_thread = None
     try:
         from actuators import run_dosing_pump
-        run_dosing_pump(decision.get("ph_adjustment", "none"))
+        dosing_thread = threading.Thread(
+            target=run_dosing_pump,
+            args=(decision.get("ph_adjustment", "none"),),
+            name="dosing",
+        )
+        dosing_thread.start()
     except Exception as e:
         logger.error("Dosing pump failed: %s", e)
 
+    # Wait for the Step 6b upload
+    if upload_future is not None:
+        try:
+            upload_future.result()
+        except Exception as e:
+            logger.error("Supabase upload failed: %s", e)
+
     # --- Step 8: Log reasoning ---
     logger.info("Step 8: Logging reasoning...")
     reasoning = decision.get("reasoning", {})
@@ -229,6 +251,10 @@ def run():
     except Exception as e:
         logger.warning("Could not restore light state: %s", e)
 
+    # The dose finished long ago unless streaming was skipped
+    if dosing_thread is not None:
+        dosing_thread.join()
+
     logger.info("=" * 60)
     logger.info("HYDROPONICS CYCLE COMPLETE")
     logger.info("=" * 60)
@@ -2,13 +2,21 @@
 sensors.py - Unified sensor reading for DHT22, DS18B20, ADS1115 (pH/TDS).
 
 Timing protocol:
-  DHT22 -> 5s gap -> DS18B20 -> 5s gap -> pH -> 150ms -> TDS
-  Each sensor: 5 reads with 2s gaps, discard first 2, average last 3
-  Total wall time: ~65 seconds
+  DHT22 (GPIO), DS18B20 (1-Wire) and pH -> 150ms -> TDS (I2C) read concurrently
+  DHT22 via pigpiod: one priming transfer, then the first valid frame
+    (up to 5 tries, 2s apart), no averaging
+  DHT22 via adafruit_dht, pH/TDS: 5 reads with 2s gaps, discard first 2,
+    average last 3
+  DS18B20: one bulk-triggered conversion, read once
+  Total wall time: ~10 seconds (the slowest sensor)
 """
 
+import asyncio
+import atexit
 import glob
 import logging
+import os
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime
@@ -30,221 +38,499 @@ class SensorReadings:
     tds_ppm: Optional[float] = None
 
 
-def _validate(value, vmin, vmax):
-    """Return value if within range, else None."""
+# Driver handles, created on the first read and reused for the process lifetime
+_HANDLES_LOCK = threading.Lock()
+_I2C = None
+_ADS = None
+_PH_CH = None
+_TDS_CH = None
+_DHT = None
+
+
+def _get_dht():
+    """Return the shared adafruit_dht.DHT22, creating it on first use."""
+    global _DHT
+    with _HANDLES_LOCK:
+        if _DHT is None:
+            import board
+            import adafruit_dht
+
+            _DHT = adafruit_dht.DHT22(getattr(board, f"D{config.DHT22_PIN}"))
+    return _DHT
+
+
+def _get_ads_channels():
+    """Return the shared (pH, TDS) ADS1115 channels, opening the I2C bus on first use."""
+    global _I2C, _ADS, _PH_CH, _TDS_CH
+    with _HANDLES_LOCK:
+        if _ADS is None:
+            import board
+            import busio
+            from adafruit_ads1x15.ads1115 import ADS1115
+            from adafruit_ads1x15.analog_in import AnalogIn
+
+            _I2C = busio.I2C(board.SCL, board.SDA)
+            _ADS = ADS1115(_I2C)
+            _PH_CH = AnalogIn(_ADS, config.ADS1115_PH_CHANNEL)
+            _TDS_CH = AnalogIn(_ADS, config.ADS1115_TDS_CHANNEL)
+    return _PH_CH, _TDS_CH
+
+
+def _cleanup():
+    """Release driver handles at interpreter exit."""
+    if _DHT is not None:
+        _DHT.exit()
+    if _I2C is not None:
+        _I2C.deinit()
+    _close_ds18b20()
+
+
+atexit.register(_cleanup)
+
+
+def _validate(value, field):
+    """Return value if within config.VALID_RANGES[field], else None."""
     if value is None:
         return None
+    vmin, vmax = config.VALID_RANGES[field]
     if vmin <= value <= vmax:
         return round(value, 2)
-    logger.warning("Value %.2f out of range [%.2f, %.2f], discarding", value, vmin, vmax)
+    logger.warning("%s %.2f out of range [%.2f, %.2f], discarding", field, value, vmin, vmax)
     return None
 
 
-def _average_valid(values):
-    """Average a list of values, ignoring Nones."""
-    valid = [v for v in values if v is not None]
-    if not valid:
+def _finalize(values, field):
+    """
+    Validate and average a NaN-padded sample array in one pass.
+    Failed reads (NaN) and samples outside config.VALID_RANGES[field] are
+    dropped; the rest are averaged and rounded to 2 decimals.
+
+    Returns:
+        float, or None if no sample is usable
+    """
+    import numpy as np
+
+    vmin, vmax = config.VALID_RANGES[field]
+    finite = np.isfinite(values)
+    mask = finite & (values >= vmin) & (values <= vmax)
+
+    rejected = int(finite.sum() - mask.sum())
+    if rejected:
+        logger.warning("%s: %d sample(s) out of range [%.2f, %.2f], discarding",
+                       field, rejected, vmin, vmax)
+    if not mask.any():
         return None
-    return sum(valid) / len(valid)
+    return round(float(values[mask].mean()), 2)
+
+
+# Longest wait for one DHT22 frame's edges to be delivered by pigpiod
+_DHT22_FRAME_TIMEOUT = 0.05
+
+
+def _dht22_pigpio_frame(pi, gpio):
+    """
+    Trigger one DHT22 transfer and decode it from pigpio's DMA edge timestamps.
+    Each bit is a 50us low followed by a 26us (0) or 70us (1) high, so the
+    falling-edge-to-falling-edge period is ~76us or ~120us.
+
+    Returns:
+        (air_temp_c, humidity_pct), or None on a short frame / bad checksum
+    """
+    import numpy as np
+    import pigpio
+
+    ticks = []
+    cb = pi.callback(gpio, pigpio.FALLING_EDGE, lambda g, level, tick: ticks.append(tick))
+    try:
+        # Start signal: hold the line low >1ms, then release to the pull-up
+        pi.set_mode(gpio, pigpio.OUTPUT)
+        pi.write(gpio, 0)
+        time.sleep(0.002)
+        pi.set_mode(gpio, pigpio.INPUT)
+
+        # Response + 40 bits take < 6ms, but ticks arrive asynchronously over
+        # pigpio's notification socket: wait until at least 41 edges are in
+        # and no more are arriving, up to _DHT22_FRAME_TIMEOUT
+        deadline = time.monotonic() + _DHT22_FRAME_TIMEOUT
+        seen = -1
+        while time.monotonic() < deadline:
+            time.sleep(0.002)
+            if len(ticks) >= 41 and len(ticks) == seen:
+                break
+            seen = len(ticks)
+    finally:
+        cb.cancel()
+
+    # The last 41 falling edges bound the 40 data bits
+    if len(ticks) < 41:
+        return None
+    periods = np.diff(np.array(ticks[-41:], dtype=np.int64)) & 0xFFFFFFFF  # tick wraps at 2^32
+    data = np.packbits(periods > 100).tolist()  # 5 bytes, MSB first
+
+    if sum(data[:4]) & 0xFF != data[4]:
+        return None
+
+    humidity = ((data[0] << 8) | data[1]) / 10.0
+    temp = (((data[2] & 0x7F) << 8) | data[3]) / 10.0
+    if data[2] & 0x80:
+        temp = -temp
+    return temp, humidity
+
+
+def _read_dht22_pigpio(pi):
+    """
+    Read the DHT22 through the pigpio daemon.
+    The sensor reports the measurement taken at the previous request, so one
+    priming transfer is discarded; then the first checksum-valid frame is used.
+
+    Returns:
+        (air_temp_c, humidity_pct) tuple, either may be None
+    """
+    import pigpio
+
+    gpio = config.DHT22_PIN
+    pi.set_pull_up_down(gpio, pigpio.PUD_UP)
+
+    # Checked once, not per read: the loops below log each sample at DEBUG
+    debug = logger.isEnabledFor(logging.DEBUG)
+    _dht22_pigpio_frame(pi, gpio)
+    for i in range(config.READINGS_PER_SENSOR):
+        # DHT22 needs 2s between transfers
+        time.sleep(config.INTRA_SENSOR_DELAY)
+        frame = _dht22_pigpio_frame(pi, gpio)
+        if frame is not None:
+            if debug:
+                logger.debug("DHT22 read %d: temp=%.1f, humidity=%.1f", i, *frame)
+            return _validate(frame[0], "air_temp_c"), _validate(frame[1], "humidity_pct")
+        if debug:
+            logger.debug("DHT22 read %d: bad frame", i)
+
+    return None, None
 
 
 def _read_dht22():
     """
     Read air temperature and humidity from DHT22.
+    Uses pigpio's DMA edge sampling when the pigpio daemon is running,
+    otherwise falls back to adafruit_dht.
+
+    Returns:
+        (air_temp_c, humidity_pct) tuple, either may be None
+    """
+    try:
+        import pigpio
+    except ImportError:
+        return _read_dht22_adafruit()
+
+    pi = pigpio.pi()
+    if not pi.connected:
+        logger.debug("pigpiod not running, using adafruit_dht")
+        return _read_dht22_adafruit()
+
+    try:
+        return _read_dht22_pigpio(pi)
+    finally:
+        pi.stop()
+
+
+def _read_dht22_adafruit():
+    """
+    Read air temperature and humidity from DHT22 via adafruit_dht.
     Takes 5 readings with 2s gaps, discards first 2, averages last 3.
 
     Returns:
         (air_temp_c, humidity_pct) tuple, either may be None
     """
-    import board
-    import adafruit_dht
+    import numpy as np
 
-    pin = getattr(board, f"D{config.DHT22_PIN}")
-    dht = adafruit_dht.DHT22(pin)
+    dht = _get_dht()
 
     temps = []
     humids = []
+    debug = logger.isEnabledFor(logging.DEBUG)
 
-    try:
-        for i in range(config.READINGS_PER_SENSOR):
-            try:
-                t = dht.temperature
-                h = dht.humidity
-                temps.append(t)
-                humids.append(h)
+    for i in range(config.READINGS_PER_SENSOR):
+        try:
+            t = dht.temperature
+            h = dht.humidity
+            temps.append(t)
+            humids.append(h)
+            if debug:
                 logger.debug("DHT22 read %d: temp=%.1f, humidity=%.1f", i, t or 0, h or 0)
-            except RuntimeError as e:
-                # RuntimeError is expected and common for DHT sensors
+        except RuntimeError as e:
+            # RuntimeError is expected and common for DHT sensors
+            if debug:
                 logger.debug("DHT22 read %d: RuntimeError: %s", i, e)
-                temps.append(None)
-                humids.append(None)
+            temps.append(None)
+            humids.append(None)
 
-            if i < config.READINGS_PER_SENSOR - 1:
-                time.sleep(config.INTRA_SENSOR_DELAY)
-    finally:
-        dht.exit()
+        if i < config.READINGS_PER_SENSOR - 1:
+            time.sleep(config.INTRA_SENSOR_DELAY)
 
-    # Discard first READINGS_TO_DISCARD, average the rest
-    kept_temps = temps[config.READINGS_TO_DISCARD:]
-    kept_humids = humids[config.READINGS_TO_DISCARD:]
+    # Discard first READINGS_TO_DISCARD, average the rest (None -> NaN)
+    kept_temps = np.array(temps[config.READINGS_TO_DISCARD:], dtype=float)
+    kept_humids = np.array(humids[config.READINGS_TO_DISCARD:], dtype=float)
 
-    air_temp = _validate(
-        _average_valid(kept_temps),
-        config.AIR_TEMP_MIN, config.AIR_TEMP_MAX
-    )
-    humidity = _validate(
-        _average_valid(kept_humids),
-        config.HUMIDITY_MIN, config.HUMIDITY_MAX
-    )
+    air_temp = _finalize(kept_temps, "air_temp_c")
+    humidity = _finalize(kept_humids, "humidity_pct")
 
     return air_temp, humidity
 
 
-def _read_ds18b20():
+# DS18B20 w1_slave file descriptor, opened once and reused across reads
+_DS18B20_FD = None
+
+# Cleared once a bulk-read trigger is refused (the sysfs entry is root-only)
+_BULK_READ_OK = True
+
+# Worst-case DS18B20 conversion time per resolution (datasheet, seconds)
+_DS18B20_CONV_TIME = {9: 0.094, 10: 0.188, 11: 0.375, 12: 0.75}
+
+
+def _ds18b20_fd():
+    """Return the cached DS18B20 fd, locating and opening the sensor on first use."""
+    global _DS18B20_FD
+    if _DS18B20_FD is None:
+        device_folders = glob.glob(config.DS18B20_BASE_DIR + "28*")
+        if not device_folders:
+            return None
+
+        # Lower resolution shortens every conversion; stored in the sensor's
+        # scratchpad, so failing to write it just keeps the current setting
+        try:
+            with open(device_folders[0] + "/resolution", "w") as f:
+                f.write(str(config.DS18B20_RESOLUTION))
+        except OSError as e:
+            logger.debug("Could not set DS18B20 resolution: %s", e)
+
+        _DS18B20_FD = os.open(device_folders[0] + "/w1_slave", os.O_RDONLY)
+    return _DS18B20_FD
+
+
+def _close_ds18b20():
+    """Drop the cached fd so the next read re-locates the sensor."""
+    global _DS18B20_FD
+    if _DS18B20_FD is not None:
+        os.close(_DS18B20_FD)
+        _DS18B20_FD = None
+
+
+def _trigger_bulk_read():
+    """
+    Start a conversion on every w1_therm sensor on the bus. The write returns
+    at once; the caller waits out the conversion.
+    Without permission to trigger, reading w1_slave converts on demand instead.
+
+    Returns:
+        Seconds until the conversion is done, or 0 if none was triggered.
+    """
+    global _BULK_READ_OK
+    if not _BULK_READ_OK:
+        return 0
+
+    try:
+        with open(config.DS18B20_BASE_DIR + "w1_bus_master1/therm_bulk_read", "w") as f:
+            f.write("trigger")
+    except OSError as e:
+        logger.debug("therm_bulk_read unavailable (%s), converting per read", e)
+        _BULK_READ_OK = False
+        return 0
+
+    return _DS18B20_CONV_TIME.get(config.DS18B20_RESOLUTION, 0.75)
+
+
+def _parse_w1_slave(buf):
+    """Return the temperature in C from a w1_slave dump, or None on CRC failure."""
+    line_end = buf.find(b"\n")
+    equals_pos = buf.find(b"t=", line_end)
+    if not buf[:line_end].rstrip().endswith(b"YES") or equals_pos == -1:
+        return None
+    # int() accepts ASCII bytes and ignores the trailing newline
+    return int(buf[equals_pos + 2:]) / 1000.0
+
+
+async def _read_ds18b20():
     """
     Read water temperature from DS18B20 via 1-Wire.
-    Takes 5 readings with 2s gaps, discards first 2, averages last 3.
+    Triggers one bus-wide conversion and reads the result once; a failed CRC is
+    retried (up to READINGS_PER_SENSOR times) with a fresh on-demand conversion.
+    The conversion is awaited on the event loop, so no thread sits in a sleep
+    while the other sensors are read.
 
     Returns:
         water_temp_c or None
     """
-    device_folders = glob.glob(config.DS18B20_BASE_DIR + "28*")
-    if not device_folders:
+    fd = _ds18b20_fd()
+    if fd is None:
         logger.warning("DS18B20 sensor not found")
         return None
 
-    sensor_path = device_folders[0] + "/w1_slave"
-    temps = []
+    conversion_time = _trigger_bulk_read()
+    if conversion_time:
+        await asyncio.sleep(conversion_time)
+
+    # After a bulk conversion w1_slave returns the stored result quickly;
+    # otherwise each read converts on demand and blocks, so run it off the loop
+    return await asyncio.to_thread(_read_ds18b20_result, fd)
+
 
+def _read_ds18b20_result(fd):
+    """Read and validate the converted DS18B20 temperature, retrying on CRC failure."""
+    debug = logger.isEnabledFor(logging.DEBUG)
     for i in range(config.READINGS_PER_SENSOR):
         try:
-            with open(sensor_path, "r") as f:
-                lines = f.readlines()
-
-            if lines[0].strip().endswith("YES"):
-                equals_pos = lines[1].find("t=")
-                if equals_pos != -1:
-                    temp_string = lines[1][equals_pos + 2:]
-                    temp_c = float(temp_string) / 1000.0
-                    temps.append(temp_c)
-                    logger.debug("DS18B20 read %d: %.2f C", i, temp_c)
-                else:
-                    temps.append(None)
-            else:
-                temps.append(None)
-        except Exception as e:
-            logger.debug("DS18B20 read %d error: %s", i, e)
-            temps.append(None)
+            # pread from offset 0 re-reads the sysfs attribute without a
+            # seek or a stdio buffer per read
+            temp_c = _parse_w1_slave(os.pread(fd, 128, 0))
+        except OSError as e:
+            # Sensor unplugged or bus reset: re-locate it and try again
+            if debug:
+                logger.debug("DS18B20 read %d error: %s", i, e)
+            _close_ds18b20()
+            fd = _ds18b20_fd()
+            if fd is None:
+                break
+            continue
+        except ValueError as e:
+            if debug:
+                logger.debug("DS18B20 read %d parse error: %s", i, e)
+            continue
+
+        if temp_c is not None:
+            if debug:
+                logger.debug("DS18B20 read %d: %.2f C", i, temp_c)
+            return _validate(temp_c, "water_temp_c")
+        if debug:
+            logger.debug("DS18B20 read %d: CRC check failed", i)
 
-        if i < config.READINGS_PER_SENSOR - 1:
-            time.sleep(config.INTRA_SENSOR_DELAY)
+    return None
+
+
+def _ph_from_volts(volts):
+    """Convert pH probe voltages (NumPy array) to pH; NaN stays NaN."""
+    return 7 + (2.5 - volts) * 3.5
 
-    kept = temps[config.READINGS_TO_DISCARD:]
-    return _validate(
-        _average_valid(kept),
-        config.WATER_TEMP_MIN, config.WATER_TEMP_MAX
-    )
+
+def _tds_from_volts(volts):
+    """Convert TDS probe voltages (NumPy array) to ppm; NaN stays NaN."""
+    import numpy as np
+
+    # Horner evaluation of 133.42*v^3 - 255.86*v^2 + 857.39*v
+    return np.polyval([133.42, -255.86, 857.39, 0.0], volts) * 0.5
 
 
 def _read_ph_tds():
     """
     Read pH and TDS from ADS1115 ADC.
     pH on channel 1, TDS on channel 0.
-    ADS1115 initialized once, shared between reads.
+    ADS1115 initialized once per process, shared between reads and cycles.
     Takes 5 readings each with 2s gaps, discards first 2, averages last 3.
 
     Returns:
         (ph, tds_ppm) tuple, either may be None
     """
-    import board
-    import busio
-    from adafruit_ads1x15.ads1115 import ADS1115
-    from adafruit_ads1x15.analog_in import AnalogIn
-
-    i2c = busio.I2C(board.SCL, board.SDA)
-    ads = ADS1115(i2c)
+    import numpy as np
 
-    ph_channel = AnalogIn(ads, config.ADS1115_PH_CHANNEL)
-    tds_channel = AnalogIn(ads, config.ADS1115_TDS_CHANNEL)
+    ph_channel, tds_channel = _get_ads_channels()
 
-    ph_values = []
-    tds_values = []
+    n = config.READINGS_PER_SENSOR
+    # NaN marks a failed read; both arrays are converted in one pass below
+    ph_volts = np.full(n, np.nan)
+    tds_volts = np.full(n, np.nan)
+    debug = logger.isEnabledFor(logging.DEBUG)
 
-    for i in range(config.READINGS_PER_SENSOR):
+    for i in range(n):
         try:
             # Read pH
-            ph_volt = ph_channel.voltage
-            ph_val = 7 + ((2.5 - ph_volt) * 3.5)
-            ph_values.append(ph_val)
-            logger.debug("pH read %d: voltage=%.4f, pH=%.2f", i, ph_volt, ph_val)
+            ph_volts[i] = ph_channel.voltage
+            if debug:
+                logger.debug("pH read %d: voltage=%.4f", i, ph_volts[i])
         except Exception as e:
-            logger.debug("pH read %d error: %s", i, e)
-            ph_values.append(None)
+            if debug:
+                logger.debug("pH read %d error: %s", i, e)
 
         time.sleep(config.PH_TDS_DELAY)
 
         try:
             # Read TDS
-            tds_volt = tds_channel.voltage
-            tds_val = (133.42 * tds_volt**3 - 255.86 * tds_volt**2 + 857.39 * tds_volt) * 0.5
-            tds_values.append(tds_val)
-            logger.debug("TDS read %d: voltage=%.4f, TDS=%.0f ppm", i, tds_volt, tds_val)
+            tds_volts[i] = tds_channel.voltage
+            if debug:
+                logger.debug("TDS read %d: voltage=%.4f", i, tds_volts[i])
         except Exception as e:
-            logger.debug("TDS read %d error: %s", i, e)
-            tds_values.append(None)
+            if debug:
+                logger.debug("TDS read %d error: %s", i, e)
 
-        if i < config.READINGS_PER_SENSOR - 1:
+        if i < n - 1:
             time.sleep(config.INTRA_SENSOR_DELAY)
 
+    ph_values = _ph_from_volts(ph_volts)
+    tds_values = _tds_from_volts(tds_volts)
+
     kept_ph = ph_values[config.READINGS_TO_DISCARD:]
     kept_tds = tds_values[config.READINGS_TO_DISCARD:]
 
-    ph = _validate(_average_valid(kept_ph), config.PH_MIN, config.PH_MAX)
-    tds = _validate(_average_valid(kept_tds), config.TDS_MIN, config.TDS_MAX)
+    ph = _finalize(kept_ph, "ph")
+    tds = _finalize(kept_tds, "tds_ppm")
 
     return ph, tds
 
 
+async def _gather_sensors():
+    """
+    Run the sensors side by side: the blocking DHT22 and ADS1115 readers in
+    the event loop's default executor, the DS18B20 as a coroutine that only
+    uses a thread for its final read. Exceptions are returned in place of
+    results so one failing sensor does not cancel the others.
+    """
+    return await asyncio.gather(
+        asyncio.to_thread(_read_dht22),
+        _read_ds18b20(),
+        asyncio.to_thread(_read_ph_tds),
+        return_exceptions=True,
+    )
+
+
 def read_all_sensors():
     """
     Master function: read all sensors following the timing protocol.
 
-    Order: DHT22 -> 5s -> DS18B20 -> 5s -> pH -> 150ms -> TDS
-    Each sensor: 5 reads, 2s apart, discard first 2, average last 3.
+    The three sensors sit on independent buses, so they are gathered
+    concurrently and the sweep takes as long as the slowest one.
+    DHT22 with pigpiod: a priming transfer, then the first valid frame of
+    up to 5 tries, 2s apart.
+    DHT22 via adafruit_dht, and pH/TDS: 5 reads, 2s apart, discard first 2,
+    average last 3.
+    DS18B20: a single conversion at DS18B20_RESOLUTION.
 
     Returns:
         SensorReadings dataclass
     """
-    readings = SensorReadings(timestamp=datetime.now().isoformat())
+    readings = SensorReadings(timestamp=datetime.now().isoformat(timespec="seconds"))
+
+    logger.info("Reading DHT22, DS18B20 and ADS1115 concurrently...")
+    dht_result, ds18b20_result, ads_result = asyncio.run(_gather_sensors())
 
     # --- DHT22 (air temp + humidity) ---
-    try:
-        logger.info("Reading DHT22 (air temp / humidity)...")
-        readings.air_temp_c, readings.humidity_pct = _read_dht22()
+    if isinstance(dht_result, Exception):
+        logger.error("DHT22 failed: %s", dht_result)
+    else:
+        readings.air_temp_c, readings.humidity_pct = dht_result
         logger.info("DHT22: air_temp=%.2f, humidity=%.2f",
                      readings.air_temp_c or 0, readings.humidity_pct or 0)
-    except Exception as e:
-        logger.error("DHT22 failed: %s", e)
-
-    time.sleep(config.INTER_SENSOR_DELAY)
 
     # --- DS18B20 (water temp) ---
-    try:
-        logger.info("Reading DS18B20 (water temp)...")
-        readings.water_temp_c = _read_ds18b20()
+    if isinstance(ds18b20_result, Exception):
+        logger.error("DS18B20 failed: %s", ds18b20_result)
+    else:
+        readings.water_temp_c = ds18b20_result
         logger.info("DS18B20: water_temp=%.2f", readings.water_temp_c or 0)
-    except Exception as e:
-        logger.error("DS18B20 failed: %s", e)
-
-    time.sleep(config.INTER_SENSOR_DELAY)
 
     # --- pH + TDS via ADS1115 ---
-    try:
-        logger.info("Reading pH and TDS via ADS1115...")
-        readings.ph, readings.tds_ppm = _read_ph_tds()
+    if isinstance(ads_result, Exception):
+        logger.error("pH/TDS failed: %s", ads_result)
+    else:
+        readings.ph, readings.tds_ppm = ads_result
         logger.info("ADS1115: pH=%.2f, TDS=%.0f ppm",
                      readings.ph or 0, readings.tds_ppm or 0)
-    except Exception as e:
-        logger.error("pH/TDS failed: %s", e)
 
     return readings
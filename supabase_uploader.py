@@ -3,8 +3,11 @@ Uploads decision data and plant photos to Supabase.
 Called after each Gemini decision cycle in main.py.
 """
 
+import atexit
+import importlib.util
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -18,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Supabase client (initialized lazily)
 _client: Optional[Client] = None
 
+# Keep-alive PostgREST session for the decisions table (initialized lazily)
+_rest = None
+
 SUPABASE_URL = os.getenv("SUPABASE_PROJECT_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SECRET_KEY")
 BUCKET_NAME = "plant-photos"
@@ -37,43 +43,67 @@ def _get_client() -> Optional[Client]:
     return _client
 
 
-def _upload_photo(client: Client, photo_path: str) -> Optional[str]:
+def _get_rest():
+    """
+    Get or create the httpx session used for decisions-table writes.
+    Auth headers are built once and the connection is kept alive for
+    reuse; HTTP/2 is used when h2 is installed.
+    Call only after _get_client() has confirmed the credentials.
+    """
+    global _rest
+    if _rest is not None:
+        return _rest
+
+    import httpx
+
+    _rest = httpx.Client(
+        base_url=f"{SUPABASE_URL}/rest/v1",
+        headers={
+            "apikey": SUPABASE_KEY,
+            "Authorization": f"Bearer {SUPABASE_KEY}",
+            "Prefer": "return=minimal",
+        },
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=2),
+        timeout=10,
+    )
+    atexit.register(_rest.close)
+    return _rest
+
+
+def _public_url(storage_path: str) -> str:
+    """Public URL of an object in the photo bucket."""
+    return f"{SUPABASE_URL}/storage/v1/object/public/{BUCKET_NAME}/{storage_path}"
+
+
+def _upload_photo(client: Client, photo_path: str, storage_path: str) -> bool:
     """
     Upload a photo to Supabase Storage.
 
     Args:
         client: Supabase client instance
         photo_path: Local file path to the JPEG photo
+        storage_path: Object name within the bucket
 
     Returns:
-        Public URL of the uploaded photo, or None if upload fails
+        True if the upload succeeded, False otherwise
     """
-    if not photo_path or not Path(photo_path).exists():
-        logger.warning(f"Photo not found at {photo_path}, skipping upload.")
-        return None
-
-    # Generate storage path from timestamp: "2026-02-08T14-00-00.jpg"
-    timestamp_str = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
-    storage_path = f"{timestamp_str}.jpg"
-
     try:
+        # Hand the open file to the client so the request body is streamed
+        # from the page cache instead of copied into a bytes object first
         with open(photo_path, "rb") as f:
-            photo_bytes = f.read()
+            client.storage.from_(BUCKET_NAME).upload(
+                path=storage_path,
+                file=f,
+                file_options={"content-type": "image/jpeg"}
+            )
 
-        client.storage.from_(BUCKET_NAME).upload(
-            path=storage_path,
-            file=photo_bytes,
-            file_options={"content-type": "image/jpeg"}
-        )
-
-        # Construct the public URL
-        public_url = f"{SUPABASE_URL}/storage/v1/object/public/{BUCKET_NAME}/{storage_path}"
-        logger.info(f"Photo uploaded: {public_url}")
-        return public_url
+        logger.info(f"Photo uploaded: {_public_url(storage_path)}")
+        return True
 
     except Exception as e:
         logger.error(f"Failed to upload photo: {e}")
-        return None
+        return False
 
 
 def upload_decision(decision: dict, readings, photo_path: Optional[str] = None) -> bool:
@@ -81,6 +111,8 @@ def upload_decision(decision: dict, readings, photo_path: Optional[str] = None)
     Upload a decision record and its associated photo to Supabase.
 
     This is the main entry point called from main.py after each cycle.
+    The photo upload runs in the background while the row is built; the row
+    is inserted once it has settled, with photo_url set only if it succeeded.
 
     Args:
         decision: The Gemini decision dict (light, air_pump, humidifier,
@@ -95,9 +127,20 @@ def upload_decision(decision: dict, readings, photo_path: Optional[str] = None)
     if client is None:
         return False
 
+    pool = ThreadPoolExecutor(max_workers=1)
     try:
-        # Upload photo first (if available)
-        photo_url = _upload_photo(client, photo_path) if photo_path else None
+        # Start the photo upload (if available) in the background
+        photo_future = None
+        photo_url = None
+        if photo_path and Path(photo_path).exists():
+            # Name the object after the sensor sweep so the photo and its row
+            # share one timestamp: "2026-02-08T14-00-00.jpg"
+            cycle_time = datetime.fromisoformat(readings.timestamp)
+            storage_path = f"{cycle_time.strftime('%Y-%m-%dT%H-%M-%S')}.jpg"
+            photo_url = _public_url(storage_path)
+            photo_future = pool.submit(_upload_photo, client, photo_path, storage_path)
+        elif photo_path:
+            logger.warning(f"Photo not found at {photo_path}, skipping upload.")
 
         # Validate and clamp plant_health_score to 0-10 range (database constraint)
         health_score = decision["plant_health_score"]
@@ -121,13 +164,20 @@ def upload_decision(decision: dict, readings, photo_path: Optional[str] = None)
             "plant_health_score": health_score,
             "intervention_needed": decision["human_intervention"]["needed"],
             "intervention_message": decision["human_intervention"].get("message", ""),
-            "photo_url": photo_url,
+            "photo_url": None,
         }
 
-        client.table("decisions").insert(row).execute()
+        # Only point the row at an object that was actually stored
+        if photo_future is not None and photo_future.result():
+            row["photo_url"] = photo_url
+
+        _get_rest().post("/decisions", json=row).raise_for_status()
+
         logger.info("Decision uploaded to Supabase successfully.")
         return True
 
     except Exception as e:
         logger.error(f"Failed to upload decision to Supabase: {e}")
         return False
+    finally:
+        pool.shutdown(wait=False)
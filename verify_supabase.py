@@ -8,6 +8,7 @@ Tests:
   4. plant-photos storage bucket exists and is public
 """
 
+import asyncio
 import os
 import sys
 from datetime import datetime
@@ -25,28 +26,9 @@ if not SUPABASE_URL or not PUBLISHABLE_KEY or not SECRET_KEY:
     sys.exit(1)
 
 
-def main():
-    from supabase import create_client
-
-    passed = 0
-    failed = 0
-
-    # --- Test 1: Publishable key SELECT ---
-    print("Test 1: Publishable key can SELECT from decisions...")
-    pub_client = create_client(SUPABASE_URL, PUBLISHABLE_KEY)
-    try:
-        result = pub_client.table("decisions").select("id").limit(1).execute()
-        # Success even if 0 rows (table might be empty)
-        print(f"  PASS — SELECT returned {len(result.data)} row(s)")
-        passed += 1
-    except Exception as e:
-        print(f"  FAIL — {e}")
-        failed += 1
-
-    # --- Test 2: Publishable key INSERT blocked ---
-    print("Test 2: Publishable key cannot INSERT into decisions...")
-    test_row = {
-        "cycle_timestamp": datetime.now().isoformat(),
+def _test_row():
+    return {
+        "cycle_timestamp": datetime.now().isoformat(timespec="seconds"),
         "light": "on",
         "air_pump": "on",
         "humidifier": "off",
@@ -55,48 +37,60 @@ def main():
         "plant_health_score": 5,
         "intervention_needed": False,
     }
+
+
+# Each test returns (passed, output lines) instead of printing, so the
+# tests can run concurrently and still report in a fixed order.
+
+def test_publishable_select(pub_client):
+    try:
+        result = pub_client.table("decisions").select("id").limit(1).execute()
+        # Success even if 0 rows (table might be empty)
+        return True, [f"  PASS — SELECT returned {len(result.data)} row(s)"]
+    except Exception as e:
+        return False, [f"  FAIL — {e}"]
+
+
+def test_publishable_insert_blocked(pub_client):
     try:
-        result = pub_client.table("decisions").insert(test_row).execute()
+        result = pub_client.table("decisions").insert(_test_row()).execute()
         # If we get here, the insert succeeded — that's a FAIL (RLS should block it)
-        print(f"  FAIL — INSERT was NOT blocked! Row id: {result.data[0]['id']}")
+        lines = [f"  FAIL — INSERT was NOT blocked! Row id: {result.data[0]['id']}"]
         # Clean up the accidental row
         pub_client.table("decisions").delete().eq("id", result.data[0]["id"]).execute()
-        failed += 1
+        return False, lines
     except Exception as e:
         error_str = str(e)
         if "policy" in error_str.lower() or "permission" in error_str.lower() or "violates" in error_str.lower() or "new row" in error_str.lower():
-            print(f"  PASS — INSERT correctly blocked by RLS")
-            passed += 1
-        else:
-            print(f"  FAIL — Unexpected error: {e}")
-            failed += 1
+            return True, [f"  PASS — INSERT correctly blocked by RLS"]
+        return False, [f"  FAIL — Unexpected error: {e}"]
 
-    # --- Test 3: Secret key INSERT + DELETE ---
-    print("Test 3: Secret key can INSERT and DELETE (bypasses RLS)...")
-    secret_client = create_client(SUPABASE_URL, SECRET_KEY)
+
+def test_secret_insert_delete(secret_client):
+    lines = []
     test_id = None
     try:
-        result = secret_client.table("decisions").insert(test_row).execute()
+        result = secret_client.table("decisions").insert(_test_row()).execute()
         test_id = result.data[0]["id"]
-        print(f"  INSERT succeeded — row id: {test_id}")
+        lines.append(f"  INSERT succeeded — row id: {test_id}")
 
         # Now delete it
         secret_client.table("decisions").delete().eq("id", test_id).execute()
-        print(f"  DELETE succeeded — test row cleaned up")
-        print(f"  PASS")
-        passed += 1
+        lines.append(f"  DELETE succeeded — test row cleaned up")
+        lines.append(f"  PASS")
+        return True, lines
     except Exception as e:
-        print(f"  FAIL — {e}")
-        failed += 1
+        lines.append(f"  FAIL — {e}")
         # Try to clean up if insert succeeded but delete failed
         if test_id:
             try:
                 secret_client.table("decisions").delete().eq("id", test_id).execute()
             except Exception:
-                print(f"  WARNING: Could not clean up test row {test_id}")
+                lines.append(f"  WARNING: Could not clean up test row {test_id}")
+        return False, lines
+
 
-    # --- Test 4: Storage bucket exists and is public ---
-    print("Test 4: plant-photos storage bucket exists and is public...")
+def test_storage_bucket(secret_client):
     try:
         buckets = secret_client.storage.list_buckets()
         plant_bucket = None
@@ -106,17 +100,50 @@ def main():
                 break
 
         if plant_bucket is None:
-            print(f"  FAIL — plant-photos bucket not found")
-            failed += 1
-        elif not plant_bucket.public:
-            print(f"  FAIL — plant-photos bucket exists but is NOT public")
-            failed += 1
-        else:
-            print(f"  PASS — plant-photos bucket exists and is public")
-            passed += 1
+            return False, [f"  FAIL — plant-photos bucket not found"]
+        if not plant_bucket.public:
+            return False, [f"  FAIL — plant-photos bucket exists but is NOT public"]
+        return True, [f"  PASS — plant-photos bucket exists and is public"]
     except Exception as e:
-        print(f"  FAIL — {e}")
-        failed += 1
+        return False, [f"  FAIL — {e}"]
+
+
+async def run_tests(pub_client, secret_client):
+    """Run all tests concurrently; the round-trips overlap instead of queueing."""
+    return await asyncio.gather(
+        asyncio.to_thread(test_publishable_select, pub_client),
+        asyncio.to_thread(test_publishable_insert_blocked, pub_client),
+        asyncio.to_thread(test_secret_insert_delete, secret_client),
+        asyncio.to_thread(test_storage_bucket, secret_client),
+    )
+
+
+TEST_NAMES = [
+    "Test 1: Publishable key can SELECT from decisions...",
+    "Test 2: Publishable key cannot INSERT into decisions...",
+    "Test 3: Secret key can INSERT and DELETE (bypasses RLS)...",
+    "Test 4: plant-photos storage bucket exists and is public...",
+]
+
+
+def main():
+    from supabase import create_client
+
+    pub_client = create_client(SUPABASE_URL, PUBLISHABLE_KEY)
+    secret_client = create_client(SUPABASE_URL, SECRET_KEY)
+
+    results = asyncio.run(run_tests(pub_client, secret_client))
+
+    passed = 0
+    failed = 0
+    for name, (ok, lines) in zip(TEST_NAMES, results):
+        print(name)
+        for line in lines:
+            print(line)
+        if ok:
+            passed += 1
+        else:
+            failed += 1
 
     # --- Summary ---
     print(f"\n{'='*40}")
@@ -1,11 +1,12 @@
 """
 video_streamer.py - Video streaming module for the AI Hydroponics system.
 
-Streams video from USB webcam to a remote PC for timelapse recording.
+Streams video from USB webcam (or CSI camera) to a remote PC for timelapse recording.
 Designed to be called from main.py as Step 9 of the control loop.
 """
 
 import logging
+import queue
 import socket
 import struct
 import time
@@ -17,6 +18,119 @@ logger = logging.getLogger("video_streamer")
 # Connection timeout in seconds
 CONNECTION_TIMEOUT = 10
 
+# Kernel send buffer; room for several full 1080p JPEG frames
+SOCKET_BUFFER_SIZE = 4 << 20
+
+# 4-byte big-endian frame length prefix
+_HDR = struct.Struct(">L")
+
+# Reused header buffer, rewritten in place for every frame sent
+_HDR_VIEW = memoryview(bytearray(_HDR.size))
+
+# Zero-length frame: tells the receiver to repeat the previous frame
+_REPEAT_FRAME = _HDR.pack(0)
+
+# Side of the luma thumbnail behind the static-frame hash
+_HASH_SIZE = 32
+
+# Encoded frames buffered between the Picamera2 encoder thread and the sender
+PICAMERA2_QUEUE_SIZE = 4
+
+
+def _send_frame(sock, payload):
+    """
+    Send one length-prefixed frame. Header and payload go to the kernel as a
+    scatter-gather list, so they are never concatenated into a new bytes object.
+    The header is packed into _HDR_VIEW, so only one sender may use it at a time.
+    """
+    _HDR.pack_into(_HDR_VIEW, 0, len(payload))
+    buffers = [_HDR_VIEW, payload]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Drop whatever the kernel accepted; resend the remainder
+        while sent:
+            if sent >= len(buffers[0]):
+                sent -= len(buffers.pop(0))
+            else:
+                buffers[0] = buffers[0][sent:]
+                sent = 0
+
+
+def _frame_hash(frame, is_jpeg):
+    """
+    Average hash of a frame: a 32x32 luma thumbnail thresholded at its mean.
+    Raw MJPEG buffers are decoded at 1/8 scale straight to grayscale, which
+    costs a fraction of a full decode; anything else must be a BGR frame.
+
+    Returns:
+        bool array of _HASH_SIZE x _HASH_SIZE bits, or None if undecodable.
+    """
+    import cv2
+
+    if is_jpeg:
+        gray = cv2.imdecode(frame, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if gray is None:
+            return None
+    else:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (_HASH_SIZE, _HASH_SIZE), interpolation=cv2.INTER_AREA)
+    return small > small.mean()
+
+
+def _stream_picamera2(client_socket, duration_seconds):
+    """
+    Stream hardware-encoded MJPEG from the shared Picamera2 instance.
+    The encoder reads the camera's DMABUFs directly; its output thread posts
+    each finished JPEG into a queue that this loop drains onto the socket.
+
+    Returns:
+        Number of frames sent.
+    """
+    from camera import get_picamera2
+    from picamera2.encoders import MJPEGEncoder
+    from picamera2.outputs import Output
+
+    picam = get_picamera2()
+    if picam is None:
+        return 0
+
+    frames = queue.Queue(maxsize=PICAMERA2_QUEUE_SIZE)
+
+    class _QueueOutput(Output):
+        def outputframe(self, frame, *args, **kwargs):
+            try:
+                frames.put_nowait(frame)
+            except queue.Full:
+                # Sender is behind; drop rather than stall the encoder
+                pass
+
+    picam.start_encoder(MJPEGEncoder(), _QueueOutput())
+    logger.info("Streaming hardware MJPEG from Picamera2")
+
+    start_time = time.time()
+    frame_count = 0
+    try:
+        while (time.time() - start_time) < duration_seconds:
+            try:
+                data = frames.get(timeout=CONNECTION_TIMEOUT)
+            except queue.Empty:
+                logger.warning("No frames from Picamera2 encoder, ending stream")
+                break
+
+            try:
+                _send_frame(client_socket, memoryview(data))
+                frame_count += 1
+            except (BrokenPipeError, ConnectionResetError) as e:
+                logger.warning("Connection lost during streaming: %s", e)
+                break
+            except OSError as e:
+                logger.warning("Socket error during streaming: %s", e)
+                break
+    finally:
+        picam.stop_encoder()
+
+    return frame_count
+
 
 def stream_video() -> bool:
     """
@@ -30,12 +144,22 @@ def stream_video() -> bool:
         logger.info("Video streaming disabled (VIDEO_STREAM_ENABLED=False)")
         return True
 
-    # Lazy import cv2 to avoid startup cost when streaming is disabled
-    try:
-        import cv2
-    except ImportError:
-        logger.warning("OpenCV (cv2) not installed, cannot stream video")
-        return False
+    use_picamera2 = config.CAMERA_BACKEND == "picamera2"
+
+    # Lazy import the camera stack to avoid startup cost when streaming is disabled
+    if use_picamera2:
+        try:
+            import picamera2  # noqa: F401
+        except ImportError:
+            logger.warning("picamera2 not installed, cannot stream video")
+            return False
+    else:
+        try:
+            import cv2
+            from camera import encode_jpeg, get_capture, is_mjpeg
+        except ImportError:
+            logger.warning("OpenCV (cv2) not installed, cannot stream video")
+            return False
 
     server_ip = config.VIDEO_SERVER_IP
     server_port = config.VIDEO_SERVER_PORT
@@ -48,6 +172,10 @@ def stream_video() -> bool:
     # Create socket and connect
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     client_socket.settimeout(CONNECTION_TIMEOUT)
+    # Push each frame out immediately; size the send buffer before the
+    # handshake so TCP window scaling can use it
+    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
 
     try:
         logger.info("Connecting to video server %s:%d...", server_ip, server_port)
@@ -69,10 +197,25 @@ def stream_video() -> bool:
     # Clear socket timeout for streaming
     client_socket.settimeout(None)
 
-    # Open camera
-    cap = cv2.VideoCapture(config.CAMERA_INDEX)
+    if use_picamera2:
+        logger.info("Streaming for %.1f minutes...", duration_minutes)
+        start_time = time.time()
+        try:
+            frame_count = _stream_picamera2(client_socket, duration_minutes * 60)
+        except KeyboardInterrupt:
+            logger.info("Stream interrupted by user")
+            frame_count = 0
+        except Exception as e:
+            logger.error("Unexpected error during streaming: %s", e)
+            frame_count = 0
+        finally:
+            client_socket.close()
+        return _log_stream_stats(frame_count, start_time)
 
-    if not cap.isOpened():
+    # Reuse the process-wide camera handle (already open if a photo was taken)
+    cap = get_capture()
+
+    if cap is None:
         logger.warning("Could not open webcam (index %d)", config.CAMERA_INDEX)
         client_socket.close()
         return False
@@ -90,11 +233,26 @@ def stream_video() -> bool:
     logger.info("Camera configured: %dx%d @ %.1f FPS (requested %dx%d @ %d FPS)",
                 actual_width, actual_height, actual_fps, width, height, hw_fps)
 
+    # The camera already delivers MJPEG: forward the driver's JPEG buffers
+    # as-is rather than decoding to BGR and re-encoding every frame.
+    # VIDEO_JPEG_QUALITY then only applies to the re-encode fallback.
+    raw = is_mjpeg(cap) and cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+    if raw:
+        logger.info("Forwarding raw MJPEG frames from the camera")
+
     # Stream video
     start_time = time.time()
     duration_seconds = duration_minutes * 60
     frame_count = 0
 
+    # Plants barely move between frames: compare each frame's hash against
+    # the last one actually sent and send a repeat marker while it matches
+    skip_static = config.VIDEO_SKIP_STATIC_FRAMES
+    sent_hash = None
+    repeat_count = 0
+    if skip_static:
+        import numpy as np
+
     logger.info("Streaming for %.1f minutes...", duration_minutes)
 
     try:
@@ -104,19 +262,41 @@ def stream_video() -> bool:
                 logger.warning("Failed to capture frame, ending stream")
                 break
 
-            # Encode frame as JPEG
-            result, frame_encoded = cv2.imencode(
-                '.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality]
-            )
-            if not result:
-                logger.warning("Failed to encode frame")
+            # A raw MJPEG buffer is already a complete JPEG (SOI marker present).
+            # Byte views over the arrays avoid a .tobytes() copy per frame.
+            payload = memoryview(frame).cast('B') if raw else None
+            is_jpeg = payload is not None and payload[:2] == b"\xff\xd8"
+            if raw and not is_jpeg:
+                # Still undecoded driver bytes, not a BGR frame: neither
+                # hashable nor encodable, so drop it
+                logger.warning("Dropping raw frame without JPEG SOI marker")
                 continue
 
-            data = frame_encoded.tobytes()
+            repeat = False
+            if skip_static:
+                frame_hash = _frame_hash(frame, is_jpeg)
+                repeat = (frame_hash is not None and sent_hash is not None and
+                          np.count_nonzero(frame_hash != sent_hash) <= config.VIDEO_STATIC_HASH_BITS)
+
+            if not repeat and not is_jpeg:
+                # Encode frame as JPEG (TurboJPEG/nvjpeg when available)
+                data = encode_jpeg(frame, jpeg_quality)
+                if not data:
+                    logger.warning("Failed to encode frame")
+                    continue
 
-            # Send frame: 4-byte length prefix + data
+                payload = memoryview(data)
+
+            # Send frame: 4-byte length prefix + data, or just a zero length
+            # when the scene is unchanged
             try:
-                client_socket.sendall(struct.pack(">L", len(data)) + data)
+                if repeat:
+                    client_socket.sendall(_REPEAT_FRAME)
+                    repeat_count += 1
+                else:
+                    _send_frame(client_socket, payload)
+                    if skip_static:
+                        sent_hash = frame_hash
                 frame_count += 1
             except (BrokenPipeError, ConnectionResetError) as e:
                 logger.warning("Connection lost during streaming: %s", e)
@@ -130,10 +310,19 @@ def stream_video() -> bool:
     except Exception as e:
         logger.error("Unexpected error during streaming: %s", e)
     finally:
-        cap.release()
+        # The shared capture is released at exit by camera.py; just restore
+        # decoded output for its next user
+        if raw:
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
         client_socket.close()
 
-    # Calculate stats
+    if repeat_count:
+        logger.info("Sent %d repeat markers for unchanged frames", repeat_count)
+    return _log_stream_stats(frame_count, start_time)
+
+
+def _log_stream_stats(frame_count, start_time):
+    """Log throughput for a finished stream; True if any frame was sent."""
     elapsed = time.time() - start_time
     avg_fps = frame_count / elapsed if elapsed > 0 else 0
 